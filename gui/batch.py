@@ -0,0 +1,241 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Sprinkler Distribution Evaluator - A Python tool to simulate and visualize sprinkler coverage
+Copyright (C) 2025 Mohamed Behery
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program. If not, see <https://www.gnu.org/licenses/>.
+"""
+
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from argparse import ArgumentParser, Namespace
+import logging
+import glob
+import json
+import csv
+import sys
+import time
+import os
+
+from sprinklers import evaluate, evaluate_catch_can, Pr_table_to_grid
+from utils import INIParser, read_csv, profiled, enable_profiling, profiling_enabled, log_worker_profiles
+import constants
+from store import ResultsStore
+
+TABLE_EXTENSIONS = ('.csv', '.xls', '.xlsx')
+FIELDNAMES = ['filepath', 'resolution', 'zone_dim_meters', 'config_meters', 'Pr_step', 'method', 'CU', 'DU', 'seconds', 'stored', 'error']
+METHODS = ('zone', 'catch-can')
+
+def collect_filepaths(patterns):
+    """
+    Expand files, directories and glob patterns into a sorted list of Pr table filepaths.
+
+    Parameters:
+        patterns (list[str]): Files, directories (searched non-recursively) or glob patterns
+                              (`**` matches subdirectories).
+
+    Returns:
+        list[str]: Absolute paths of the CSV/Excel files found, without duplicates.
+    """
+    filepaths = set()
+    for pattern in patterns:
+        if os.path.isdir(pattern):
+            candidates = glob.glob(os.path.join(pattern, '*'))
+        else:
+            candidates = glob.glob(pattern, recursive=True)
+        for candidate in candidates:
+            if os.path.isfile(candidate) and os.path.splitext(candidate)[-1].lower() in TABLE_EXTENSIONS:
+                filepaths.add(os.path.abspath(candidate))
+    return sorted(filepaths)
+
+def _new_row(filepath, resolution, zone_dim_meters, config_meters, method='zone'):
+    """
+    Create a row holding the inputs of an evaluation, with empty results.
+    """
+    row = dict.fromkeys(FIELDNAMES, '')
+    row.update(
+        filepath        = filepath,
+        method          = method,
+        resolution      = resolution,
+        zone_dim_meters = ' x '.join(map(str, zone_dim_meters)),
+        config_meters   = ' x '.join(map(str, config_meters)),
+        stored          = False,
+    )
+    return row
+
+@profiled
+def evaluate_file(filepath, resolution, zone_dim_meters, config_meters, method='zone'):
+    """
+    Evaluate a single Pr table file, returning its metrics as a flat row.
+    Errors are reported in the row's `error` field instead of being raised.
+
+    Parameters:
+        filepath (str): Path to the CSV/Excel Pr table.
+        resolution (int): Pixels per meter.
+        zone_dim_meters (tuple[float, float]): Zone dimensions in meters.
+        config_meters (tuple[float] or tuple[float, float]): Sprinkler configuration dimensions.
+        method (str): 'zone' evaluates the zone's homogeneous plot with `evaluate()`,
+                      'catch-can' the interior repeat cell with `evaluate_catch_can()`,
+                      reported as 'catch-can' or, when it falls back to the raster, 'raster'.
+
+    Returns:
+        dict: Row with the keys of `FIELDNAMES`.
+    """
+    row = _new_row(filepath, resolution, zone_dim_meters, config_meters, method)
+    start = time.perf_counter()
+    try:
+        Pr_table = read_csv(filepath)
+        assert Pr_table is not None, 'The Pr table could not be read.'
+        row['Pr_step'] = Pr_table_to_grid(Pr_table)[1]
+        if method == 'catch-can':
+            result = evaluate_catch_can(resolution, config_meters, Pr_table)
+            row['method'] = 'catch-can' if result.native else 'raster'
+        else:
+            result = evaluate(resolution, zone_dim_meters, config_meters, Pr_table)
+        row.update(CU=result.metrics.CU, DU=result.metrics.DU)
+    except Exception as e:
+        row['error'] = f'{type(e).__name__}: {e}'
+    row['seconds'] = round(time.perf_counter() - start, 4)
+    return row
+
+def evaluate_files(filepaths, resolution, zone_dim_meters, config_meters, max_workers=None, store_filepath=None, method='zone'):
+    """
+    Evaluate Pr table files across a process pool.
+
+    If a results store is given, files whose inputs were already evaluated are
+    answered from it without evaluation, and new results are recorded in it.
+
+    Parameters:
+        filepaths (list[str]): Paths to the CSV/Excel Pr tables.
+        resolution (int): Pixels per meter.
+        zone_dim_meters (tuple[float, float]): Zone dimensions in meters.
+        config_meters (tuple[float] or tuple[float, float]): Sprinkler configuration dimensions.
+        max_workers (int): Number of worker processes, defaults to the CPU count.
+        store_filepath (str): Optional path to a SQLite results store (see `store.ResultsStore`),
+                              which only holds 'zone' evaluations.
+        method (str): Evaluation method, see `evaluate_file`.
+
+    Yields:
+        dict: One row per file (see `evaluate_file`), stored rows first, then in order of completion.
+    """
+    store = None if store_filepath is None or method != 'zone' else ResultsStore(store_filepath)
+    Pr_tables = {}
+    try:
+        with ProcessPoolExecutor(max_workers) as executor:
+            futures = []
+            for filepath in filepaths:
+                if store is not None:
+                    start = time.perf_counter()
+                    Pr_tables[filepath] = Pr_table = read_csv(filepath)
+                    metrics = None if Pr_table is None else store.lookup(resolution, zone_dim_meters, config_meters, Pr_table)
+                    if metrics is not None:
+                        row = _new_row(filepath, resolution, zone_dim_meters, config_meters)
+                        row.update(Pr_step=Pr_table_to_grid(Pr_table)[1], CU=metrics.CU, DU=metrics.DU, stored=True)
+                        row['seconds'] = round(time.perf_counter() - start, 4)
+                        yield row
+                        continue
+                futures.append(executor.submit(evaluate_file, filepath, resolution, zone_dim_meters, config_meters, method))
+            for future in as_completed(futures):
+                row = future.result()
+                if store is not None and not row['error']:
+                    metrics = Namespace(CU=row['CU'], DU=row['DU'])
+                    store.record(resolution, zone_dim_meters, config_meters, Pr_tables[row['filepath']], metrics, row['filepath'])
+                yield row
+    finally:
+        if store is not None:
+            store.close()
+
+def write_rows(rows, f, fmt):
+    """
+    Stream rows to an open text file as CSV or JSON lines, flushing after each row.
+
+    Parameters:
+        rows (iterable[dict]): Rows with the keys of `FIELDNAMES`.
+        f: Open text file
+        fmt (str): Either 'csv' or 'jsonl'.
+    """
+    if fmt == 'csv':
+        writer = csv.DictWriter(f, fieldnames=FIELDNAMES)
+        writer.writeheader()
+        write_row = writer.writerow
+    else:
+        write_row = lambda row: f.write(json.dumps(row) + '\n')
+    for row in rows:
+        write_row(row)
+        f.flush()
+
+def parse_args(argv=None):
+    """
+    Parse the command-line arguments, filling unspecified parameters from a config.ini.
+    """
+    parser = ArgumentParser(description='Evaluate the distribution uniformity of many Pr tables headlessly.')
+    parser.add_argument('inputs', nargs='+', help='Pr table files, directories or glob patterns (CSV/XLS/XLSX).')
+    parser.add_argument('-r', '--resolution', type=int, help='Pixels per meter.')
+    parser.add_argument('-z', '--zone', type=float, nargs=2, metavar=('WIDTH', 'HEIGHT'), help='Zone dimensions in meters.')
+    parser.add_argument('-c', '--config', type=float, nargs='+', metavar='METERS',
+                        help='Sprinkler configuration in meters: SIDE (triangle) or WIDTH HEIGHT (rectangle).')
+    parser.add_argument('-i', '--ini', default='config.ini', help='config.ini providing the unspecified parameters.')
+    parser.add_argument('-o', '--output', help='Output .csv or .jsonl file, defaults to JSON lines on stdout.')
+    parser.add_argument('-w', '--workers', type=int, help='Number of worker processes, defaults to the CPU count.')
+    parser.add_argument('-p', '--profile', action='store_true',
+                        help=f'Profile every evaluation (also enabled by {constants.Profiling.ENVVAR}=1).')
+    parser.add_argument('-m', '--method', choices=METHODS, default='zone',
+                        help="'zone' evaluates the zone's homogeneous plot; 'catch-can' the interior repeat cell "
+                             'on the catch-can grid when the spacings are multiples of it, else on the raster.')
+    parser.add_argument('-s', '--store', help='SQLite results store to answer repeated evaluations from and record new ones to.')
+    args = parser.parse_args(argv)
+
+    if None in (args.resolution, args.zone, args.config):
+        config_parser = INIParser()
+        with open(args.ini, 'r') as f:
+            config_parser.read_file(f)
+        if args.resolution is None:
+            args.resolution = config_parser.getint('Display', 'RESOLUTION')
+        if args.zone is None:
+            args.zone = config_parser.gettuple('Sprinklers', 'ZONE_DIM_METERS')
+        if args.config is None:
+            args.config = config_parser.gettuple('Sprinklers', 'CONFIG_METERS')
+    if args.store and args.method != 'zone':
+        parser.error('--store only holds zone evaluations.')
+    if len(args.config) not in {1, 2}:
+        parser.error('--config takes either 1 (triangle) or 2 (rectangle) values.')
+    args.zone, args.config = tuple(args.zone), tuple(args.config)
+    return args
+
+def main(argv=None):
+    """
+    Evaluate every Pr table matched by the inputs and stream one metrics row per file.
+    """
+    args = parse_args(argv)
+    if args.profile:
+        enable_profiling()
+    if profiling_enabled():
+        logging.basicConfig(level=logging.INFO)
+    start = time.time()
+    filepaths = collect_filepaths(args.inputs)
+    if not filepaths:
+        sys.exit('No CSV/Excel Pr tables matched the inputs.')
+    rows = evaluate_files(filepaths, args.resolution, args.zone, args.config, args.workers, args.store, args.method)
+    if args.output is None:
+        write_rows(rows, sys.stdout, 'jsonl')
+    else:
+        fmt = 'csv' if args.output.lower().endswith('.csv') else 'jsonl'
+        with open(args.output, 'w', newline='') as f:
+            write_rows(rows, f, fmt)
+    if profiling_enabled():
+        log_worker_profiles(start)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,264 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Sprinkler Distribution Evaluator - A Python tool to simulate and visualize sprinkler coverage
+Copyright (C) 2025 Mohamed Behery
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program. If not, see <https://www.gnu.org/licenses/>.
+"""
+
+from argparse import ArgumentParser
+from datetime import datetime
+import subprocess
+import tracemalloc
+import itertools
+import platform
+import json
+import time
+import sys
+import os
+import numpy as np
+
+from sprinklers import (
+    evaluate, evaluate_repeat_cell, evaluate_uncertainty, Pr_table_to_grid, Pr_table_to_quadrant, generate_sliding_window, generate_sprinklers_mask,
+    Pr_quadrant_to_plot, Pr_plot_to_zone, Pr_zone_to_homogenous_plot, compute_CU, compute_DU,
+)
+
+RESOLUTIONS = (10, 25, 50, 100, 200)
+ZONES_METERS = ((20.0, 15.0), (50.0, 35.0))
+CONFIGS_METERS = ((5.0,), (5.0, 5.0))
+
+def synthetic_Pr_table(radius_meters=5.0, step=1.0, peak=20.0, seed=0):
+    """
+    Generate a synthetic catch-can Pr table around a single sprinkler: a radial
+    falloff of `peak` mm/hr to zero at `radius_meters`, with 5% multiplicative noise.
+
+    Parameters:
+        radius_meters (float): Wetted radius, also the extent of the table in x and y.
+        step (float): Catch-can spacing in meters.
+        peak (float): Pr at the sprinkler in mm/hr.
+        seed (int): Seed of the noise, for reproducibility.
+
+    Returns:
+        np.ndarray: Table of [x, y, Pr] rows, sorted by x then y.
+    """
+    rng = np.random.default_rng(seed)
+    positions = step * np.arange(int(round(radius_meters / step)) + 1)
+    x, y = np.meshgrid(positions, positions, indexing='ij')
+    distance = np.hypot(x, y) / radius_meters
+    Pr = peak * np.clip(1 - distance ** 2, 0, None) * rng.normal(1, 0.05, distance.shape)
+    return np.stack([x.ravel(), y.ravel(), Pr.clip(0).round(2).ravel()], axis=1)
+
+def measure(function, *args, repeat=3):
+    """
+    Time a call over `repeat` runs and measure its peak traced allocations.
+
+    Returns:
+        tuple: The call's result, the best wall time in seconds and the peak allocated bytes.
+    """
+    seconds = np.inf
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = function(*args)
+        seconds = min(seconds, time.perf_counter() - start)
+    tracemalloc.start()
+    tracemalloc.reset_peak()
+    function(*args)
+    peak_bytes = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return result, seconds, peak_bytes
+
+def benchmark_case(Pr_table, resolution, zone_meters, configuration_meters, repeat=3):
+    """
+    Time every stage of the evaluation pipeline separately, chaining them as `evaluate()` does.
+
+    Returns:
+        list[dict]: One record per stage with its inputs, `seconds` and `peak_bytes`.
+    """
+    zone_meters_yx, configuration_meters_yx = map(lambda x: np.array(x[::-1]), (zone_meters, configuration_meters))
+    is_triangle = configuration_meters_yx.size == 1
+    zone_pixels = (resolution * zone_meters_yx).astype('int')
+    configuration_pixels = (resolution * configuration_meters_yx).astype('int')
+
+    stages = {}
+    _, *stages['Pr_table_to_grid'] = measure(Pr_table_to_grid, Pr_table, repeat=repeat)
+    Pr_quadrant, *stages['Pr_table_to_quadrant'] = measure(Pr_table_to_quadrant, Pr_table, resolution, repeat=repeat)
+    sliding_window, *stages['generate_sliding_window'] = measure(generate_sliding_window, configuration_pixels, is_triangle, repeat=repeat)
+    sprinklers_mask, *stages['generate_sprinklers_mask'] = measure(generate_sprinklers_mask, zone_pixels, sliding_window, is_triangle, repeat=repeat)
+    Pr_plot, *stages['Pr_quadrant_to_plot'] = measure(Pr_quadrant_to_plot, Pr_quadrant, repeat=repeat)
+    Pr_zone, *stages['Pr_plot_to_zone'] = measure(Pr_plot_to_zone, Pr_plot, sprinklers_mask, repeat=repeat)
+    Pr_homogenous_plot, *stages['Pr_zone_to_homogenous_plot'] = measure(Pr_zone_to_homogenous_plot, Pr_zone, sliding_window, is_triangle, repeat=repeat)
+    _, *stages['compute_CU'] = measure(compute_CU, Pr_homogenous_plot, repeat=repeat)
+    _, *stages['compute_DU'] = measure(compute_DU, Pr_homogenous_plot, repeat=repeat)
+    _, *stages['evaluate_repeat_cell'] = measure(evaluate_repeat_cell, resolution, configuration_meters, Pr_table, repeat=repeat)
+    _, *stages['evaluate_uncertainty'] = measure(evaluate_uncertainty, resolution, configuration_meters, Pr_table, 0.05, 1000, (5, 50, 95), 0, repeat=repeat)
+
+    return [
+        dict(
+            stage                = stage,
+            resolution           = resolution,
+            zone_meters          = list(zone_meters),
+            configuration_meters = list(configuration_meters),
+            layout               = 'triangle' if is_triangle else 'rectangle',
+            zone_pixels          = zone_pixels.tolist(),
+            seconds              = seconds,
+            peak_bytes           = peak_bytes,
+        )
+        for stage, (seconds, peak_bytes) in stages.items()
+    ]
+
+def benchmark_rendering(Pr_table, resolution, zone_meters, configuration_meters, rotations=10):
+    """
+    Time the 3D canvases' rendering of an evaluation: plotting the zone and the
+    homogeneous plot, then rotating each with `rotations` key presses.
+
+    Requires PyQt5; the canvases are rendered offscreen unless a display platform is set.
+
+    Returns:
+        list[dict]: One record per canvas and action with its inputs, `seconds` (mean per frame),
+                    `peak_bytes` (plot only), the mean `surface_ms`, `draw_ms` and `blit_ms`, and `vertices`.
+    """
+    os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+    from PyQt5.QtWidgets import QApplication
+    from PyQt5.QtGui import QKeyEvent
+    from PyQt5.QtCore import Qt, QEvent
+    from widgets import Canvas4ImageAs3D
+    app = QApplication.instance() or QApplication(sys.argv[:1])
+
+    result = evaluate(resolution, zone_meters, configuration_meters, Pr_table)
+    records = []
+    for name, image in (('zone', result.zone), ('homogenous_plot', result.homogenous_plot)):
+        canvas = Canvas4ImageAs3D()
+        canvas.show()
+        _, _, peak_bytes = measure(canvas.plot, image, resolution, (45, -135), repeat=1)
+        app.processEvents()
+        canvas.frames.clear()
+        for _ in range(rotations):
+            canvas.keyPressEvent(QKeyEvent(QEvent.KeyPress, Qt.Key_A, Qt.NoModifier))
+            app.processEvents()
+        canvas.plot(image, resolution, (45, -135))
+        app.processEvents()
+        frames = canvas.render_stats.frames
+        for kind, stage in (('plot', 'Canvas4ImageAs3D.plot'), ('rotate', 'Canvas4ImageAs3D.keyPressEvent')):
+            kind_frames = [frame for frame in frames if frame.kind == kind]
+            mean_ms = lambda field: float(np.mean([getattr(frame, field) or 0.0 for frame in kind_frames]))
+            records.append(dict(
+                stage                = f'{stage}[{name}]',
+                resolution           = resolution,
+                zone_meters          = list(zone_meters),
+                configuration_meters = list(configuration_meters),
+                layout               = 'triangle' if len(configuration_meters) == 1 else 'rectangle',
+                zone_pixels          = list(result.zone.shape),
+                seconds              = 1e-3 * (mean_ms('surface_ms') + mean_ms('draw_ms') + mean_ms('blit_ms')),
+                peak_bytes           = peak_bytes if kind == 'plot' else None,
+                surface_ms           = mean_ms('surface_ms'),
+                draw_ms              = mean_ms('draw_ms'),
+                blit_ms              = mean_ms('blit_ms'),
+                vertices             = canvas.render_stats.vertices,
+            ))
+        canvas.close()
+    return records
+
+def run(resolutions=RESOLUTIONS, zones_meters=ZONES_METERS, configs_meters=CONFIGS_METERS, repeat=3, render=False, log=sys.stderr):
+    """
+    Benchmark every stage over the matrix of resolutions, zones and sprinkler layouts,
+    and optionally the rendering of each case on the 3D canvases.
+
+    Returns:
+        dict: Environment metadata and the list of per-stage records.
+    """
+    Pr_table = synthetic_Pr_table()
+    records = []
+    for resolution, zone_meters, configuration_meters in itertools.product(resolutions, zones_meters, configs_meters):
+        start = time.perf_counter()
+        records += benchmark_case(Pr_table, resolution, tuple(zone_meters), tuple(configuration_meters), repeat)
+        if render:
+            records += benchmark_rendering(Pr_table, resolution, tuple(zone_meters), tuple(configuration_meters))
+        print(f'resolution={resolution} zone={zone_meters} config={configuration_meters}: '
+              f'{time.perf_counter() - start:.2f} s', file=log)
+    return dict(
+        metadata = dict(
+            commit    = _git_commit(),
+            timestamp = datetime.now().isoformat(timespec='seconds'),
+            python    = platform.python_version(),
+            numpy     = np.__version__,
+            machine   = platform.platform(),
+            cpu_count = os.cpu_count(),
+            repeat    = repeat,
+        ),
+        records = records,
+    )
+
+def compare(baseline, current):
+    """
+    Compare two benchmark reports stage by stage.
+
+    Returns:
+        list[str]: One line per common record with the time and memory ratios (current / baseline).
+    """
+    record_key = lambda r: (r['stage'], r['resolution'], tuple(r['zone_meters']), tuple(r['configuration_meters']))
+    baseline_records = {record_key(r): r for r in baseline['records']}
+    lines = []
+    for record in current['records']:
+        base = baseline_records.get(record_key(record))
+        if base is None:
+            continue
+        time_ratio = record['seconds'] / max(base['seconds'], 1e-9)
+        memory_ratio = None if record['peak_bytes'] is None else record['peak_bytes'] / max(base['peak_bytes'] or 1, 1)
+        lines.append(
+            f'{record["stage"]:<48} res={record["resolution"]:<4} zone={record["zone_meters"]} '
+            f'{record["layout"]:<9} time x{time_ratio:.2f}' + ('' if memory_ratio is None else f'  memory x{memory_ratio:.2f}')
+        )
+    return lines
+
+def _git_commit():
+    """
+    Return the current git commit hash, or None outside a git checkout.
+    """
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', 'HEAD'], capture_output=True, text=True, check=True,
+            cwd=os.path.dirname(os.path.abspath(__file__)),
+        ).stdout.strip()
+    except Exception:
+        return None
+
+def main(argv=None):
+    """
+    Run the benchmark suite from the command line and write a JSON report.
+    """
+    parser = ArgumentParser(description='Benchmark every stage of the sprinklers evaluation pipeline.')
+    parser.add_argument('-o', '--output', default='benchmark.json', help='JSON report to write.')
+    parser.add_argument('-r', '--resolutions', type=int, nargs='+', default=RESOLUTIONS, help='Resolutions in pixels per meter.')
+    parser.add_argument('-z', '--zones', type=float, nargs='+', default=[x for zone in ZONES_METERS for x in zone],
+                        metavar='METERS', help='Zone dimensions as WIDTH HEIGHT pairs.')
+    parser.add_argument('--render', action='store_true', help='Also benchmark the 3D canvases (plotting and rotation).')
+    parser.add_argument('--repeat', type=int, default=3, help='Timed runs per stage (the best is kept).')
+    parser.add_argument('--compare', metavar='BASELINE', help='Baseline JSON report to compare the new report against.')
+    args = parser.parse_args(argv)
+    if len(args.zones) % 2:
+        parser.error('--zones takes WIDTH HEIGHT pairs.')
+    zones_meters = list(zip(args.zones[::2], args.zones[1::2]))
+
+    report = run(args.resolutions, zones_meters, CONFIGS_METERS, args.repeat, args.render)
+    with open(args.output, 'w') as f:
+        json.dump(report, f, indent=1)
+    if args.compare:
+        with open(args.compare, 'r') as f:
+            baseline = json.load(f)
+        print('\n'.join(compare(baseline, report)))
+
+
+if __name__ == '__main__':
+    main()
@@ -19,6 +19,8 @@ along with this program. If not, see <https://www.gnu.org/licenses/>.
 """
 
 from typing import Final
+import tempfile
+import os
 
 class StaticClass:
     """
@@ -31,7 +33,73 @@ class Evaluation(StaticClass):
     """
     Evaluation-related constants.
     """
-    DELAY_MS: Final = 1000
+    DELAY_MS: Final         = 1000
+    MIN_DELAY_MS: Final     = 150
+    MAX_DELAY_MS: Final     = 3000
+    DELAY_FACTOR: Final     = 2.0
+    TIMINGS_HISTORY: Final  = 5
+    MEMMAP_MIN_BYTES: Final = 1024 ** 3
+    MEMORY_BUDGET_MB: Final = 4096
+    AUTO_TOLERANCE: Final   = 0.1
+    AUTO_FACTOR: Final      = 2 ** 0.5
+    UNCERTAINTY_SAMPLES: Final     = 1000
+    UNCERTAINTY_PERCENTILES: Final = (5, 95)
+    UNCERTAINTY_SEED: Final        = 0
+    UNCERTAINTY_CACHE_SIZE: Final  = 8
+    SCRATCH_DIRPATH: Final  = os.path.join(tempfile.gettempdir(), 'sprinkler-distribution-evaluator')
+    
+class Snapshots(StaticClass):
+    """
+    Snapshot export constants.
+    """
+    ORBIT_FRAMES: Final = 36
+    
+class Rendering(StaticClass):
+    """
+    Canvas render instrumentation constants.
+    """
+    TIMINGS_HISTORY: Final  = 30
+    OVERLAY_FONTSIZE: Final = 8
+    
+class Profiling(StaticClass):
+    """
+    Opt-in profiling constants.
+    """
+    ENVVAR: Final  = 'SPRINKLERS_PROFILE'
+    DIRPATH: Final = os.path.join(os.path.expanduser('~'), '.cache', 'sprinkler-distribution-evaluator', 'profiles')
+    TOP_N: Final   = 25
+    
+class Cache(StaticClass):
+    """
+    On-disk cache constants.
+    """
+    TABLES_DIRPATH: Final = os.path.join(os.path.expanduser('~'), '.cache', 'sprinkler-distribution-evaluator', 'tables')
+    
+class Logs(StaticClass):
+    """
+    Raw catch-can log ingestion constants.
+    """
+    STREAMING_BYTES: Final = 16 * 1024 ** 2
+    CHUNK_ROWS: Final      = 1_000_000
+    DECIMALS: Final        = 6
+    
+class Exports(StaticClass):
+    """
+    Table and raster export constants.
+    """
+    CSV_FORMAT: Final   = '%.6g'
+    CHUNK_VALUES: Final = 1024 ** 2
+    
+class Service(StaticClass):
+    """
+    Local evaluation service constants.
+    """
+    HOST: Final              = '127.0.0.1'
+    PORT: Final              = 8765
+    CACHE_SIZE: Final        = 16
+    CACHE_BYTES: Final       = 512 * 1024 ** 2
+    MAX_REQUEST_BYTES: Final = 64 * 1024 ** 2
+    TIMEOUT_S: Final         = 120
     
 class Cells(StaticClass):
     """
@@ -149,6 +217,16 @@ class Themes(StaticClass):
             background-color: #031634;
         }
         
+        QPushButton#export_zone_button {
+            background-color: #0b3d91;
+        }
+        QPushButton#export_zone_button:hover {
+            background-color: #072f6b;
+        }
+        QPushButton#export_zone_button:pressed {
+            background-color: #031634;
+        }
+        
         QPushButton#export_config_button {
             background-color: #607d8b;
         }
@@ -159,6 +237,26 @@ class Themes(StaticClass):
             background-color: #455a64;
         }
 
+        QPushButton#save_project_button, QPushButton#open_project_button {
+            background-color: #2e7d32;
+        }
+        QPushButton#save_project_button:hover, QPushButton#open_project_button:hover {
+            background-color: #256b29;
+        }
+        QPushButton#save_project_button:pressed, QPushButton#open_project_button:pressed {
+            background-color: #1b5e20;
+        }
+
+        QPushButton#auto_resolution_button {
+            background-color: #00796b;
+        }
+        QPushButton#auto_resolution_button:hover {
+            background-color: #00695c;
+        }
+        QPushButton#auto_resolution_button:pressed {
+            background-color: #004d40;
+        }
+
         QComboBox QAbstractItemView {
             selection-color: #111;
         }
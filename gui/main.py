@@ -21,9 +21,10 @@ along with this program. If not, see <https://www.gnu.org/licenses/>.
 from PyQt5.QtWidgets import QApplication
 from viewmodel import ViewModel
 
+import logging
 import sys
 from model import Model
-from utils import INIParser
+from utils import INIParser, enable_profiling, profiling_enabled
 from view import View
 
 def main():
@@ -32,7 +33,8 @@ def main():
     
     Steps:
     1. Create the QApplication instance.
-    2. Parse the configuration file using INIParser.
+    2. Parse the configuration file using INIParser, enabling profiling if
+       `[General] PROFILE` is true (or the `SPRINKLERS_PROFILE` environment variable is set).
     3. Initialize the Model using configuration values.
     4. Wrap the Model in a ViewModel.
     5. Initialize the View, passing the ViewModel and parser.
@@ -43,6 +45,10 @@ def main():
     
     parser = INIParser()
     parser.read()
+    if parser.has_option('General', 'PROFILE') and parser.getboolean('General', 'PROFILE'):
+        enable_profiling()
+    if profiling_enabled():
+        logging.basicConfig(level=logging.INFO)
     
     model = Model(
         resolution        = parser.getint('Display', 'RESOLUTION'),
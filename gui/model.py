@@ -19,7 +19,7 @@ along with this program. If not, see <https://www.gnu.org/licenses/>.
 """
 from argparse import Namespace
 import numpy as np
-from utils import read_csv
+from utils import read_csv, content_key
 from sprinklers import Pr_table_to_grid, Pr_grid_to_table
 
 class Model:
@@ -36,6 +36,10 @@ class Model:
         self._snapshots_dirpath = snapshots_dirpath
         self._Pr_grid = None
         self._Pr_step = None
+        self._Pr_table = None
+        self._Pr_table_stale = False
+        self._Pr_table_key = None
+        self._Pr_grid_key = None
         self._evaluation_result = None
         
         self.csv_filepath = csv_filepath
@@ -95,12 +99,28 @@ class Model:
     
     @property
     def Pr_table(self):
+        if self._Pr_table_stale:
+            self._Pr_table = Pr_grid_to_table(self._Pr_grid, self._Pr_step)
+            self._Pr_table_stale = False
         return self._Pr_table
     
     @Pr_table.setter
     def Pr_table(self, value:np.ndarray):
-        self._Pr_table = value
         self._Pr_grid, self._Pr_step = Pr_table_to_grid(value)
+        self._Pr_grid_key = content_key(self._Pr_grid)
+        self._Pr_table = value
+        self._Pr_table_stale = False
+        self._Pr_table_key = None
+    
+    @property
+    def Pr_table_key(self):
+        if self._Pr_table_key is None:
+            self._Pr_table_key = content_key(self.Pr_table)
+        return self._Pr_table_key
+    
+    @property
+    def Pr_grid_key(self):
+        return self._Pr_grid_key
     
     @property
     def Pr_step(self):
@@ -109,7 +129,7 @@ class Model:
     @Pr_step.setter
     def Pr_step(self, value:float):
         self._Pr_step = value
-        self.Pr_table = Pr_grid_to_table(self._Pr_grid, value)
+        self._invalidate_Pr_table()
     
     @property
     def Pr_grid(self):
@@ -118,7 +138,14 @@ class Model:
     @Pr_grid.setter
     def Pr_grid(self, value:np.ndarray):
         self._Pr_grid = value
-        self.Pr_table = Pr_grid_to_table(value, self._Pr_step)
+        self._Pr_grid_key = content_key(value)
+        self._invalidate_Pr_table()
+        
+    def _invalidate_Pr_table(self):
+        # The Pr grid and step are canonical; the Pr table is derived lazily from them.
+        self._Pr_table = None
+        self._Pr_table_stale = True
+        self._Pr_table_key = None
         
     def __repr__(self):
         return f'{self.__class__.__name__}(resolution={self._resolution}, zone_dim_meters={self._zone_dim_meters}, config_meters={self._config_meters}, csv_filepath={self._csv_filepath})'
@@ -0,0 +1,282 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Sprinkler Distribution Evaluator - A Python tool to simulate and visualize sprinkler coverage
+Copyright (C) 2025 Mohamed Behery
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program. If not, see <https://www.gnu.org/licenses/>.
+"""
+
+from argparse import ArgumentParser, Namespace
+import importlib
+import itertools
+import warnings
+import sys
+import os
+import numpy as np
+
+import sprinklers
+from benchmark import synthetic_Pr_table
+from utils import read_csv
+
+GOLDEN_FILEPATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures', 'parity.npz')
+SAMPLE_FILEPATHS = [os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', filename) for filename in ('van.csv', 'van 18.csv')]
+CATCH_CAN_CONFIGS_METERS = ((5.0, 5.0), (4.0, 7.0), (3.0, 3.0), (6.0, 4.0), (2.0, 2.0), (3.5, 2.5))
+STAGES = ('Pr_table_to_quadrant', 'generate_sprinklers_mask', 'Pr_plot_to_zone')
+OUTPUTS = ('Pr_quadrant', 'sprinklers_mask', 'zone', 'homogenous_plot')
+METRICS = ('CU', 'DU')
+
+def generate_corpus():
+    """
+    Generate the parity corpus: synthetic Pr tables at several catch-can spacings,
+    evaluated at resolutions giving odd and even pixel sizes, with triangle and
+    rectangle layouts, over zones both larger and smaller than one window.
+
+    Returns:
+        list[Namespace]: Cases with a unique `name` and the arguments of `evaluate()`:
+                         `resolution`, `zone_meters`, `configuration_meters` and `Pr_table`.
+    """
+    Pr_tables = {
+        'r5s1':   synthetic_Pr_table(radius_meters=5.0, step=1.0, seed=1),
+        'r4s0.5': synthetic_Pr_table(radius_meters=4.0, step=0.5, seed=2),
+    }
+    resolutions = (10, 13)
+    configs_meters = ((5.0,), (5.0, 5.0), (4.1, 3.3))
+    zones_meters = ((20.0, 15.0), (17.3, 9.1), (3.0, 2.0))
+    corpus = []
+    for (tablename, Pr_table), resolution, configuration_meters, zone_meters in itertools.product(
+        Pr_tables.items(), resolutions, configs_meters, zones_meters
+    ):
+        serialize_floats = lambda floats: 'x'.join(map(str, floats))
+        corpus.append(Namespace(
+            name                 = f'{tablename}_res{resolution}_config{serialize_floats(configuration_meters)}_zone{serialize_floats(zone_meters)}',
+            resolution           = resolution,
+            zone_meters          = zone_meters,
+            configuration_meters = configuration_meters,
+            Pr_table             = Pr_table,
+        ))
+    return corpus
+
+def run_pipeline(case, functions=None):
+    """
+    Run the evaluation pipeline on a case, as `evaluate()` does, optionally
+    substituting some stages.
+
+    Parameters:
+        case (Namespace): A case of `generate_corpus()`.
+        functions (dict[str, callable]): Replacements of the stages named in `STAGES`.
+
+    Returns:
+        Namespace: The arrays named in `OUTPUTS` and the metrics named in `METRICS`.
+    """
+    functions = {stage: getattr(sprinklers, stage) for stage in STAGES} | (functions or {})
+    zone_meters, configuration_meters = map(lambda x: np.array(x[::-1]), (case.zone_meters, case.configuration_meters))
+    is_triangle = configuration_meters.size == 1
+    zone_pixels = (case.resolution * zone_meters).astype('int')
+    configuration_pixels = (case.resolution * configuration_meters).astype('int')
+
+    with warnings.catch_warnings(), np.errstate(all='ignore'):
+        warnings.simplefilter('ignore', RuntimeWarning)
+        sliding_window  = sprinklers.generate_sliding_window(configuration_pixels, is_triangle)
+        sprinklers_mask = functions['generate_sprinklers_mask'](zone_pixels, sliding_window, is_triangle)
+        Pr_quadrant     = functions['Pr_table_to_quadrant'](case.Pr_table, case.resolution)
+        Pr_plot         = sprinklers.Pr_quadrant_to_plot(Pr_quadrant)
+        Pr_zone         = functions['Pr_plot_to_zone'](Pr_plot, sprinklers_mask)
+        homogenous_plot = sprinklers.Pr_zone_to_homogenous_plot(Pr_zone, sliding_window, is_triangle)
+        CU = sprinklers.compute_CU(homogenous_plot) if homogenous_plot.size else np.nan
+        DU = sprinklers.compute_DU(homogenous_plot) if homogenous_plot.size else np.nan
+    return Namespace(
+        Pr_quadrant     = Pr_quadrant,
+        sprinklers_mask = sprinklers_mask,
+        zone            = Pr_zone,
+        homogenous_plot = homogenous_plot,
+        CU              = CU,
+        DU              = DU,
+    )
+
+def compare_outputs(expected, actual, rtol=1e-9, atol=1e-9, metrics_atol=0.01):
+    """
+    Compare two pipeline outputs array by array and metric by metric.
+
+    Parameters:
+        expected, actual (Namespace): Outputs of `run_pipeline()`.
+        rtol, atol (float): Tolerances of the arrays (see `np.allclose`).
+        metrics_atol (float): Absolute tolerance of CU and DU in percent.
+
+    Returns:
+        list[str]: Descriptions of the mismatches, empty if the outputs agree.
+    """
+    mismatches = []
+    for name in OUTPUTS:
+        expected_array, actual_array = np.asarray(getattr(expected, name)), np.asarray(getattr(actual, name))
+        if expected_array.shape != actual_array.shape:
+            mismatches.append(f'{name}: shape {actual_array.shape} != {expected_array.shape}')
+        elif not np.allclose(actual_array, expected_array, rtol=rtol, atol=atol, equal_nan=True):
+            max_difference = np.nanmax(np.abs(actual_array.astype(float) - expected_array.astype(float)))
+            mismatches.append(f'{name}: max difference {max_difference:.3g}')
+    for name in METRICS:
+        expected_value, actual_value = float(getattr(expected, name)), float(getattr(actual, name))
+        if np.isnan(expected_value) and np.isnan(actual_value):
+            continue
+        if not abs(actual_value - expected_value) <= metrics_atol:
+            mismatches.append(f'{name}: {actual_value} != {expected_value}')
+    return mismatches
+
+def write_golden(corpus, filepath=GOLDEN_FILEPATH):
+    """
+    Write the reference outputs of every case to a compressed .npz fixture.
+    """
+    arrays = {}
+    for case in corpus:
+        outputs = run_pipeline(case)
+        for name in OUTPUTS + METRICS:
+            arrays[f'{case.name}__{name}'] = np.asarray(getattr(outputs, name))
+    os.makedirs(os.path.dirname(filepath), exist_ok=True)
+    np.savez_compressed(filepath, **arrays)
+
+def read_golden(filepath=GOLDEN_FILEPATH):
+    """
+    Read the golden outputs written by `write_golden()`.
+
+    Returns:
+        dict[str, Namespace]: Outputs shaped like `run_pipeline()`'s, by case name.
+    """
+    golden = {}
+    with np.load(filepath) as archive:
+        for key in archive.files:
+            case_name, _, name = key.rpartition('__')
+            outputs = golden.setdefault(case_name, Namespace())
+            value = archive[key]
+            setattr(outputs, name, value.item() if name in METRICS else value)
+    return golden
+
+def check_parity(candidates=None, golden_filepath=GOLDEN_FILEPATH, **tolerances):
+    """
+    Check the reference stages against the golden outputs and, if candidate
+    implementations are given, check them against the reference stages, both
+    stage by stage on identical inputs and through the whole pipeline.
+
+    Parameters:
+        candidates (dict[str, callable]): Candidate implementations of the stages named in `STAGES`.
+        golden_filepath (str): Path of the golden outputs fixture.
+        tolerances: Keyword tolerances of `compare_outputs()`.
+
+    Returns:
+        list[str]: One line per failing case and check, empty if everything agrees.
+    """
+    candidates = candidates or {}
+    golden = read_golden(golden_filepath)
+    failures = []
+    for case in generate_corpus():
+        reference = run_pipeline(case)
+        if case.name not in golden:
+            failures.append(f'{case.name} [golden]: missing, regenerate the fixture with --update')
+        else:
+            failures += [f'{case.name} [golden]: {m}' for m in compare_outputs(golden[case.name], reference, **tolerances)]
+        for stage, candidate in candidates.items():
+            outputs = run_pipeline(case, {stage: candidate})
+            failures += [f'{case.name} [{stage}]: {m}' for m in compare_outputs(reference, outputs, **tolerances)]
+        if len(candidates) > 1:
+            outputs = run_pipeline(case, candidates)
+            failures += [f'{case.name} [all candidates]: {m}' for m in compare_outputs(reference, outputs, **tolerances)]
+    return failures
+
+def _lowest_quarter_DU(cell, weights):
+    """
+    DU of a repeat cell averaging exactly the lowest quarter of its weighted values,
+    the last one in part. Both cells compared by `check_catch_can` are piecewise
+    constant, with their own ties at the quartile, so the DU of `compute_DU`, taken
+    strictly below it, can select different fractions of them.
+    """
+    order = np.argsort(cell, axis=None, kind='stable')
+    sorted_cell, sorted_weights = cell.ravel()[order], weights.ravel()[order].astype(float)
+    quarter = 0.25 * sorted_weights.sum()
+    LQ_weights = np.clip(quarter - (np.cumsum(sorted_weights) - sorted_weights), 0, sorted_weights)
+    mean_height = np.average(sorted_cell, weights=sorted_weights)
+    return round(np.sum(LQ_weights * sorted_cell) / quarter / mean_height * 100, 2)
+
+def check_catch_can(resolution=400, metrics_atol=0.5):
+    """
+    Check that the catch-can overlap method (`evaluate_catch_can`) agrees with the
+    raster repeat cell (`evaluate_repeat_cell`) at a fine resolution, on the sample
+    Pr tables of the repository and the synthetic ones, for every configuration of
+    `CATCH_CAN_CONFIGS_METERS` falling on their catch-can grid. The raster converges
+    to the catch-can method as 1 / resolution. CU is compared as computed, DU with
+    the ties at the quartile shared out (see `_lowest_quarter_DU`).
+
+    Returns:
+        list[str]: One line per disagreeing case, empty if everything agrees.
+    """
+    Pr_tables = {
+        'r5s1':   synthetic_Pr_table(radius_meters=5.0, step=1.0, seed=1),
+        'r4s0.5': synthetic_Pr_table(radius_meters=4.0, step=0.5, seed=2),
+    }
+    for filepath in SAMPLE_FILEPATHS:
+        if os.path.isfile(filepath):
+            Pr_tables[os.path.basename(filepath)] = read_csv(filepath)
+    failures = []
+    for (tablename, Pr_table), configuration_meters in itertools.product(Pr_tables.items(), CATCH_CAN_CONFIGS_METERS):
+        if sprinklers.catch_can_lattice(configuration_meters, sprinklers.Pr_table_to_grid(Pr_table)[1]) is None:
+            continue
+        expected = sprinklers.evaluate_repeat_cell(resolution, configuration_meters, Pr_table)
+        actual = sprinklers.evaluate_catch_can(resolution, configuration_meters, Pr_table)
+        for result in (expected, actual):
+            result.metrics.DU = _lowest_quarter_DU(result.cell, result.weights)
+        for name in METRICS:
+            expected_value, actual_value = getattr(expected.metrics, name), getattr(actual.metrics, name)
+            if not abs(actual_value - expected_value) <= metrics_atol:
+                failures.append(f'{tablename}_config{"x".join(map(str, configuration_meters))} [catch-can]: '
+                                f'{name} {actual_value} != {expected_value}')
+    return failures
+
+def _load_candidate(spec):
+    """
+    Parse a `STAGE=module:function` command-line candidate into its stage and function.
+    """
+    stage, _, target = spec.partition('=')
+    module_name, _, function_name = target.partition(':')
+    if stage not in STAGES or not module_name or not function_name:
+        raise ValueError(f'Invalid candidate "{spec}", expected STAGE=module:function with STAGE in {STAGES}.')
+    return stage, getattr(importlib.import_module(module_name), function_name)
+
+def main(argv=None):
+    """
+    Check parity from the command line, exiting with status 1 on any mismatch.
+    """
+    parser = ArgumentParser(description='Check accelerated pipeline stages against the reference implementation.')
+    parser.add_argument('--candidate', action='append', default=[], metavar='STAGE=module:function',
+                        help=f'Candidate implementation of a stage, one of {", ".join(STAGES)}. Repeatable.')
+    parser.add_argument('--update', action='store_true', help='Regenerate the golden outputs from the reference stages.')
+    parser.add_argument('--golden', default=GOLDEN_FILEPATH, help='Golden outputs fixture (.npz).')
+    parser.add_argument('--rtol', type=float, default=1e-9, help='Relative tolerance of the arrays.')
+    parser.add_argument('--atol', type=float, default=1e-9, help='Absolute tolerance of the arrays.')
+    parser.add_argument('--metrics-atol', type=float, default=0.01, help='Absolute tolerance of CU and DU in percent.')
+    parser.add_argument('--catch-can', action='store_true',
+                        help='Also check the catch-can method against the raster repeat cell at a fine resolution.')
+    args = parser.parse_args(argv)
+
+    if args.update:
+        write_golden(generate_corpus(), args.golden)
+        print(f'Golden outputs written to {args.golden}')
+        return
+    candidates = dict(map(_load_candidate, args.candidate))
+    failures = check_parity(candidates, args.golden, rtol=args.rtol, atol=args.atol, metrics_atol=args.metrics_atol)
+    if args.catch_can:
+        failures += check_catch_can()
+    print('\n'.join(failures) if failures else f'{len(generate_corpus())} cases agree.')
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == '__main__':
+    main()
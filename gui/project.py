@@ -0,0 +1,154 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Sprinkler Distribution Evaluator - A Python tool to simulate and visualize sprinkler coverage
+Copyright (C) 2025 Mohamed Behery
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program. If not, see <https://www.gnu.org/licenses/>.
+"""
+
+from argparse import Namespace
+import numpy as np
+import tempfile
+import zipfile
+import json
+import os
+
+PROJECT_VERSION = 1
+
+def save_project(filepath, resolution, zone_dim_meters, config_meters, csv_filepath,
+                 snapshots_dirpath, Pr_grid, Pr_step, evaluation_result):
+    """
+    Save a full evaluation session to a binary project file (.npz).
+
+    Arrays are stored uncompressed so that `load_project` can memory-map them. The
+    file is written next to its destination and then moved into place, so that the
+    arrays of a project loaded from the same path, mapped to the replaced file, stay
+    readable while it is saved, and a failed save leaves the previous file intact.
+
+    Parameters:
+        filepath (str): Path of the project file to write.
+        resolution (int): Pixels per meter.
+        zone_dim_meters (tuple[float, float]): Zone dimensions in meters.
+        config_meters (tuple[float] or tuple[float, float]): Sprinkler configuration dimensions.
+        csv_filepath (str): Path of the Pr table file the session started from.
+        snapshots_dirpath (str): Directory where snapshots are saved.
+        Pr_grid (np.ndarray): 2D grid of Pr values.
+        Pr_step (float): Spacing between grid points in meters.
+        evaluation_result (Namespace): The result returned by `evaluate()`.
+    """
+    config = dict(
+        version           = PROJECT_VERSION,
+        resolution        = resolution,
+        zone_dim_meters   = list(zone_dim_meters),
+        config_meters     = list(config_meters),
+        csv_filepath      = csv_filepath,
+        snapshots_dirpath = snapshots_dirpath,
+        Pr_step           = Pr_step,
+        key               = evaluation_result.key,
+        metrics           = vars(evaluation_result.metrics),
+    )
+    filepath = os.path.abspath(filepath)
+    os.makedirs(os.path.dirname(filepath), exist_ok=True)
+    with tempfile.NamedTemporaryFile(dir=os.path.dirname(filepath), suffix='.npz', delete=False) as f:
+        temp_filepath = f.name
+    try:
+        np.savez(
+            temp_filepath,
+            config                     = np.array(json.dumps(config)),
+            Pr_grid                    = Pr_grid,
+            zone                       = evaluation_result.zone,
+            homogenous_plot            = evaluation_result.homogenous_plot,
+            sprinklers_mask            = evaluation_result.sprinklers_mask,
+            homogenous_sprinklers_mask = evaluation_result.homogenous_sprinklers_mask,
+        )
+        os.replace(temp_filepath, filepath)
+    except BaseException:
+        os.remove(temp_filepath)
+        raise
+
+def _memmap_npz_member(filepath, archive, name):
+    """
+    Memory-map an uncompressed .npy member of a .npz archive in place.
+
+    Parameters:
+        filepath (str): Path of the .npz archive.
+        archive (zipfile.ZipFile): The opened archive.
+        name (str): Member name without the `.npy` extension.
+
+    Returns:
+        np.ndarray: A read-only np.memmap of the member, or the loaded array
+                    if the member is compressed or cannot be mapped.
+    """
+    info = archive.getinfo(f'{name}.npy')
+    with archive.open(info) as member:
+        version = np.lib.format.read_magic(member)
+        if version == (1, 0):
+            shape, fortran_order, dtype = np.lib.format.read_array_header_1_0(member)
+        else:
+            shape, fortran_order, dtype = np.lib.format.read_array_header_2_0(member)
+        header_size = member.tell()
+    if info.compress_type != zipfile.ZIP_STORED or dtype.hasobject or 0 in shape:
+        with archive.open(info) as member:
+            return np.lib.format.read_array(member)
+    with open(filepath, 'rb') as f:
+        f.seek(info.header_offset + 26)
+        filename_size, extra_size = np.frombuffer(f.read(4), dtype='<u2')
+    data_offset = info.header_offset + 30 + int(filename_size) + int(extra_size) + header_size
+    order = 'F' if fortran_order else 'C'
+    return np.memmap(filepath, dtype=dtype, mode='r', offset=data_offset, shape=shape, order=order)
+
+def load_project(filepath, mmap=True):
+    """
+    Load a project file written by `save_project` without recomputing the evaluation.
+
+    Parameters:
+        filepath (str): Path of the project file.
+        mmap (bool): If True, the zone and plot arrays are memory-mapped and
+                     only read from disk when accessed.
+
+    Returns:
+        Namespace: Contains
+            - resolution, zone_dim_meters, config_meters, csv_filepath,
+              snapshots_dirpath, Pr_step: The saved configuration.
+            - Pr_grid (np.ndarray): The saved Pr grid.
+            - evaluation_result (Namespace): The saved result, shaped like `evaluate()`'s.
+    """
+    filepath = os.path.abspath(filepath)
+    with zipfile.ZipFile(filepath) as archive:
+        load = lambda name: _memmap_npz_member(filepath, archive, name) if mmap else np.load(archive.open(f'{name}.npy'))
+        config = json.loads(str(np.load(archive.open('config.npy'))))
+        assert config['version'] <= PROJECT_VERSION, \
+               f'Project file version {config["version"]} is newer than the supported version {PROJECT_VERSION}.'
+        Pr_grid = np.load(archive.open('Pr_grid.npy'))
+        evaluation_result = Namespace(
+            key                        = config['key'],
+            zone                       = load('zone'),
+            homogenous_plot            = load('homogenous_plot'),
+            sprinklers_mask            = load('sprinklers_mask'),
+            homogenous_sprinklers_mask = load('homogenous_sprinklers_mask'),
+            metrics                    = Namespace(**config['metrics']),
+            profile                    = None,
+            integral                   = None,
+        )
+    return Namespace(
+        resolution        = config['resolution'],
+        zone_dim_meters   = tuple(config['zone_dim_meters']),
+        config_meters     = tuple(config['config_meters']),
+        csv_filepath      = config['csv_filepath'],
+        snapshots_dirpath = config['snapshots_dirpath'],
+        Pr_step           = config['Pr_step'],
+        Pr_grid           = Pr_grid,
+        evaluation_result = evaluation_result,
+    )
@@ -0,0 +1,260 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Sprinkler Distribution Evaluator - A Python tool to simulate and visualize sprinkler coverage
+Copyright (C) 2025 Mohamed Behery
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program. If not, see <https://www.gnu.org/licenses/>.
+"""
+
+from concurrent.futures import ProcessPoolExecutor
+from collections import OrderedDict
+from argparse import ArgumentParser, Namespace
+import urllib.request
+import asyncio
+import logging
+import json
+import time
+import io
+import numpy as np
+
+from sprinklers import evaluate
+from utils import content_key, profiled, enable_profiling, profiling_enabled, log_worker_profiles
+import constants
+
+def _parse_request(payload):
+    """
+    Validate and normalize an evaluation request's JSON payload.
+
+    Parameters:
+        payload (dict): Contains `resolution`, `zone_dim_meters`, `config_meters`,
+                        `Pr_table` (list of [x, y, Pr] rows or null) and optionally `arrays`.
+
+    Returns:
+        tuple[str, tuple, bool]: The request's content key, the arguments of
+                                 `evaluate()` and whether arrays are requested.
+    """
+    resolution = int(payload['resolution'])
+    zone_dim_meters = tuple(float(x) for x in payload['zone_dim_meters'])
+    config_meters = tuple(float(x) for x in payload['config_meters'])
+    Pr_table = payload.get('Pr_table')
+    Pr_table = None if Pr_table is None else np.array(Pr_table, dtype=float)
+    args = (resolution, zone_dim_meters, config_meters, Pr_table)
+    return content_key(*args), args, bool(payload.get('arrays', False))
+
+def _serialize_result(result):
+    """
+    Serialize an evaluation result into its JSON summary and its arrays as .npz bytes.
+    """
+    summary = json.dumps(dict(key=result.key, metrics=vars(result.metrics))).encode()
+    buffer = io.BytesIO()
+    np.savez(
+        buffer,
+        summary                    = np.array(summary.decode()),
+        zone                       = result.zone,
+        homogenous_plot            = result.homogenous_plot,
+        sprinklers_mask            = result.sprinklers_mask,
+        homogenous_sprinklers_mask = result.homogenous_sprinklers_mask,
+    )
+    return summary, buffer.getvalue()
+
+@profiled
+def _evaluate_serialized(args):
+    """
+    Evaluate in a worker process and return the serialized result.
+    """
+    return _serialize_result(evaluate(*args))
+
+class EvaluationService:
+    """
+    Asynchronous local HTTP/JSON evaluation service.
+
+    Evaluations run in a process pool. Identical requests, i.e. with the same
+    Pr table, resolution, zone and configuration, share a single in-flight
+    evaluation, and completed results are kept in an LRU cache bounded both in
+    entries and in the total bytes of their serialized arrays; a result larger than
+    the whole byte budget is served but not cached.
+
+    Endpoints:
+        POST /evaluate: JSON request (see `_parse_request`); responds with the JSON
+                        summary {key, metrics}, or with .npz bytes if `arrays` is true.
+        GET /health: Responds with the cache and in-flight counts and the cached bytes.
+    """
+    def __init__(self, max_workers=None, cache_size=constants.Service.CACHE_SIZE, cache_bytes=constants.Service.CACHE_BYTES):
+        self.executor = ProcessPoolExecutor(max_workers)
+        self.cache_size = cache_size
+        self.cache_bytes = cache_bytes
+        self.cache = OrderedDict()
+        self.cached_bytes = 0
+        self.in_flight = {}
+
+    async def get_result(self, key, args):
+        """
+        Return the serialized result of a request, from the cache, from an identical
+        in-flight evaluation, or from a new evaluation in the process pool.
+        """
+        if key in self.cache:
+            self.cache.move_to_end(key)
+            return self.cache[key]
+        if key not in self.in_flight:
+            loop = asyncio.get_running_loop()
+            self.in_flight[key] = loop.run_in_executor(self.executor, _evaluate_serialized, args)
+        future = self.in_flight[key]
+        try:
+            result = await asyncio.shield(future)
+        finally:
+            if self.in_flight.get(key) is future and future.done():
+                del self.in_flight[key]
+        result_bytes = sum(map(len, result))
+        if key not in self.cache and result_bytes <= self.cache_bytes:
+            self.cache[key] = result
+            self.cached_bytes += result_bytes
+            while len(self.cache) > self.cache_size or self.cached_bytes > self.cache_bytes:
+                _, evicted = self.cache.popitem(last=False)
+                self.cached_bytes -= sum(map(len, evicted))
+        return result
+
+    async def handle(self, reader, writer):
+        """
+        Handle a single HTTP/1.1 connection carrying one request.
+        """
+        try:
+            request_line = (await reader.readline()).decode('latin-1').split()
+            headers = {}
+            while (line := await reader.readline()) not in (b'\r\n', b'\n', b''):
+                name, _, value = line.decode('latin-1').partition(':')
+                headers[name.strip().lower()] = value.strip()
+            content_length = int(headers.get('content-length', 0))
+            if content_length > constants.Service.MAX_REQUEST_BYTES:
+                return self._respond(writer, 413, b'{"error": "Request too large."}')
+            body = await reader.readexactly(content_length)
+
+            if len(request_line) < 2:
+                return self._respond(writer, 400, b'{"error": "Malformed request."}')
+            method, path = request_line[:2]
+            if method == 'GET' and path == '/health':
+                health = dict(cached=len(self.cache), cached_bytes=self.cached_bytes, in_flight=len(self.in_flight))
+                return self._respond(writer, 200, json.dumps(health).encode())
+            if method != 'POST' or path != '/evaluate':
+                return self._respond(writer, 404, b'{"error": "Not found."}')
+
+            try:
+                key, args, arrays = _parse_request(json.loads(body))
+            except Exception as e:
+                return self._respond(writer, 400, json.dumps(dict(error=f'Invalid request: {e}')).encode())
+            summary, npz = await self.get_result(key, args)
+            if arrays:
+                return self._respond(writer, 200, npz, 'application/x-npz')
+            return self._respond(writer, 200, summary)
+        except Exception as e:
+            logging.error(f'Failed to handle evaluation request.\nError Details: {e}')
+            self._respond(writer, 500, json.dumps(dict(error=str(e))).encode())
+        finally:
+            await writer.drain()
+            writer.close()
+
+    @staticmethod
+    def _respond(writer, status, body, content_type='application/json'):
+        """
+        Write a complete HTTP response with the given status and body.
+        """
+        reasons = {200: 'OK', 400: 'Bad Request', 404: 'Not Found', 413: 'Payload Too Large', 500: 'Internal Server Error'}
+        writer.write(
+            f'HTTP/1.1 {status} {reasons[status]}\r\n'
+            f'Content-Type: {content_type}\r\n'
+            f'Content-Length: {len(body)}\r\n'
+            'Connection: close\r\n\r\n'.encode('latin-1') + body
+        )
+
+    async def serve(self, host=constants.Service.HOST, port=constants.Service.PORT):
+        """
+        Serve requests until cancelled.
+        """
+        server = await asyncio.start_server(self.handle, host, port)
+        logging.info(f'Evaluation service listening on http://{host}:{port}')
+        async with server:
+            await server.serve_forever()
+
+def evaluate_remote(url, resolution, zone_dim_meters, config_meters, Pr_table, timeout=constants.Service.TIMEOUT_S):
+    """
+    Evaluate through a running `EvaluationService`, with the same arguments and
+    result as `sprinklers.evaluate()`.
+
+    Parameters:
+        url (str): Base URL of the service, e.g. 'http://127.0.0.1:8765'.
+        resolution, zone_dim_meters, config_meters, Pr_table: See `sprinklers.evaluate()`.
+        timeout (float): Seconds to wait for the response.
+
+    Returns:
+        Namespace: The evaluation result, shaped like `evaluate()`'s.
+    """
+    payload = dict(
+        resolution      = resolution,
+        zone_dim_meters = list(zone_dim_meters),
+        config_meters   = list(config_meters),
+        Pr_table        = None if Pr_table is None else np.asarray(Pr_table, dtype=float).tolist(),
+        arrays          = True,
+    )
+    request = urllib.request.Request(
+        url.rstrip('/') + '/evaluate',
+        data=json.dumps(payload).encode(),
+        headers={'Content-Type': 'application/json'},
+    )
+    with urllib.request.urlopen(request, timeout=timeout) as response:
+        content = response.read()
+    with np.load(io.BytesIO(content)) as archive:
+        summary = json.loads(str(archive['summary']))
+        return Namespace(
+            key                        = summary['key'],
+            zone                       = archive['zone'],
+            homogenous_plot            = archive['homogenous_plot'],
+            sprinklers_mask            = archive['sprinklers_mask'],
+            homogenous_sprinklers_mask = archive['homogenous_sprinklers_mask'],
+            metrics                    = Namespace(**summary['metrics']),
+            profile                    = None,
+            integral                   = None,
+        )
+
+def main(argv=None):
+    """
+    Run the evaluation service from the command line.
+    """
+    parser = ArgumentParser(description='Serve sprinkler evaluations over HTTP/JSON on the local machine.')
+    parser.add_argument('--host', default=constants.Service.HOST, help='Interface to bind, localhost by default.')
+    parser.add_argument('--port', type=int, default=constants.Service.PORT, help='Port to listen on.')
+    parser.add_argument('--workers', type=int, help='Number of worker processes, defaults to the CPU count.')
+    parser.add_argument('--profile', action='store_true',
+                        help=f'Profile every evaluation (also enabled by {constants.Profiling.ENVVAR}=1).')
+    parser.add_argument('--cache-size', type=int, default=constants.Service.CACHE_SIZE, help='Number of cached results.')
+    parser.add_argument('--cache-mb', type=float, default=constants.Service.CACHE_BYTES / 1024 ** 2,
+                        help='Total size of the cached results in MiB.')
+    args = parser.parse_args(argv)
+    if args.profile:
+        enable_profiling()
+
+    logging.basicConfig(level=logging.INFO)
+    start = time.time()
+    service = EvaluationService(args.workers, args.cache_size, int(args.cache_mb * 1024 ** 2))
+    try:
+        asyncio.run(service.serve(args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        service.executor.shutdown()
+        if profiling_enabled():
+            log_worker_profiles(start)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,205 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Sprinkler Distribution Evaluator - A Python tool to simulate and visualize sprinkler coverage
+Copyright (C) 2025 Mohamed Behery
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program. If not, see <https://www.gnu.org/licenses/>.
+"""
+
+from concurrent.futures import ProcessPoolExecutor
+import multiprocessing
+import functools
+import threading
+import tempfile
+import shutil
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
+from argparse import Namespace
+import numpy as np
+import logging
+import os
+
+def draw_surface(ax, image, resolution, deg_angles):
+    """
+    Draw a 2D image array as a 3D surface on the given axes with proper axis scaling.
+
+    Parameters:
+        ax: Matplotlib 3D axes to draw on (cleared first)
+        image: 2D numpy array representing Pr values
+        resolution: spatial resolution in pixels per meter
+        deg_angles: tuple (elev, azim) for viewing angles in degrees
+
+    Returns:
+        Poly3DCollection: The surface artist
+    """
+    h, w = image.shape
+    x_range = np.arange(w) / resolution
+    y_range = np.arange(h) / resolution
+    x_map, y_map = np.meshgrid(x_range, y_range)
+
+    ax.clear()
+    surface = ax.plot_surface(x_map, y_map, image, cmap='Blues', edgecolor='none')
+    ax.view_init(*deg_angles)
+    ax.set_xlabel('x (m)', labelpad=10)
+    ax.set_ylabel('y (m)', labelpad=10)
+    ax.set_zlabel('Pr (mm/hr)', labelpad=10)
+
+    dx = x_range.max() - x_range.min()
+    dy = y_range.max() - y_range.min()
+    dz = 0.5 * (dx + dy)
+    ax.set_box_aspect([dx, dy, dz])
+    return surface
+
+def snapshot_filepath_stem(snapshots_dirpath, tablename, elev, azim):
+    """
+    Build the snapshot filepath stem for a Pr table viewed at the given angles.
+
+    Negative angles are wrapped in parentheses, e.g. `18__elev_45__azim_(135)`.
+
+    Parameters:
+        snapshots_dirpath (str): Directory where snapshots are saved.
+        tablename (str): Name of the Pr table file without extension.
+        elev (float): Elevation angle in degrees.
+        azim (float): Azimuth angle in degrees.
+
+    Returns:
+        str: Filepath stem, to be suffixed with `__zone.png` or `__plot.png`.
+    """
+    format_angle = lambda name, angle: f'{name}_' + ('' if angle > 0 else '(') + str(abs(angle)) + ('' if angle > 0 else ')')
+    str_elev = format_angle('elev', elev)
+    str_azim = format_angle('azim', azim)
+    return os.path.join(snapshots_dirpath, f'{tablename}__{str_elev}__{str_azim}')
+
+def orbit_angles(elev, azim, n_frames):
+    """
+    Generate `n_frames` viewing angles evenly spaced over a full turn of azimuth.
+
+    Parameters:
+        elev (float): Fixed elevation angle in degrees.
+        azim (float): Starting azimuth angle in degrees.
+        n_frames (int): Number of frames in the turntable.
+
+    Returns:
+        list[tuple[float, float]]: (elev, azim) pairs, azimuths wrapped to (-180, 180].
+    """
+    step = 360 / n_frames
+    angles = []
+    for i in range(n_frames):
+        frame_azim = round((azim + i * step + 180) % 360 - 180, 2)
+        frame_azim = 180 if frame_azim == -180 else frame_azim
+        if float(frame_azim).is_integer():
+            frame_azim = int(frame_azim)
+        angles.append((elev, frame_azim))
+    return angles
+
+def create_executor(max_workers=None):
+    """
+    Create a process pool for `export_snapshots`, meant to be kept and reused across
+    exports. Its workers are spawned as fresh interpreters rather than forked, so
+    they do not inherit the state of the (Qt) parent process.
+
+    Parameters:
+        max_workers (int): Number of worker processes, defaults to the CPU count.
+
+    Returns:
+        ProcessPoolExecutor: The process pool.
+    """
+    return ProcessPoolExecutor(max_workers, mp_context=multiprocessing.get_context('spawn'))
+
+@functools.lru_cache(maxsize=8)
+def _load_image(filepath):
+    """
+    Memory-map an image saved by `export_snapshots`, once per worker process.
+    """
+    return np.load(filepath, mmap_mode='r')
+
+def _render_snapshot(image_filepath, resolution, deg_angles, filepath, figsize, dpi):
+    """
+    Render one image at the given angles with the headless Agg backend and save it.
+    """
+    fig = Figure(figsize, dpi)
+    FigureCanvasAgg(fig)
+    ax = fig.add_subplot(111, projection='3d')
+    draw_surface(ax, _load_image(image_filepath), resolution, deg_angles)
+    fig.savefig(filepath, dpi=300, bbox_inches='tight')
+    return filepath
+
+def export_snapshots(images, resolution, angles, snapshots_dirpath, tablename,
+                     figsize=(5, 4), dpi=100, executor=None, max_workers=None):
+    """
+    Render and save snapshots of several images at several angles in worker processes.
+
+    The call returns as soon as the tasks are submitted; the caller may wait on
+    the returned futures or simply let them complete in the background.
+    The images are saved once to a scratch directory, removed when all the tasks
+    are done, and memory-mapped by the workers, so that only filepaths and angles
+    are sent with each task.
+
+    Parameters:
+        images (dict[str, np.ndarray]): Images keyed by file suffix, e.g. {'zone': ..., 'plot': ...}.
+        resolution (int): Pixels per meter of the images.
+        angles (list[tuple[float, float]]): (elev, azim) pairs to render.
+        snapshots_dirpath (str): Directory where snapshots are saved.
+        tablename (str): Name of the Pr table file without extension.
+        figsize (tuple[float, float]): Figure size in inches.
+        dpi (int): Figure dpi before exporting at 300 dpi.
+        executor (ProcessPoolExecutor): Pool to render in (see `create_executor`); if None,
+                                        a pool is created for this call only.
+        max_workers (int): Number of worker processes of a pool created for this call.
+
+    Returns:
+        list[concurrent.futures.Future]: One future per saved file, resolving to its filepath.
+    """
+    snapshots_dirpath = os.path.abspath(snapshots_dirpath)
+    os.makedirs(snapshots_dirpath, exist_ok=True)
+    scratch_dirpath = tempfile.mkdtemp(prefix='snapshots-')
+    image_filepaths = {}
+    for name, image in images.items():
+        image_filepaths[name] = os.path.join(scratch_dirpath, f'{name}.npy')
+        np.save(image_filepaths[name], np.asarray(image))
+    
+    owned_executor = executor is None
+    if owned_executor:
+        executor = create_executor(max_workers)
+    remaining = Namespace(count=len(angles) * len(images), lock=threading.Lock())
+    def on_done(future):
+        _log_snapshot(future)
+        with remaining.lock:
+            remaining.count -= 1
+            if remaining.count == 0:
+                shutil.rmtree(scratch_dirpath, ignore_errors=True)
+    
+    futures = []
+    for elev, azim in angles:
+        filepath_stem = snapshot_filepath_stem(snapshots_dirpath, tablename, elev, azim)
+        for name in images:
+            future = executor.submit(_render_snapshot, image_filepaths[name], resolution, (elev, azim),
+                                     f'{filepath_stem}__{name}.png', figsize, dpi)
+            future.add_done_callback(on_done)
+            futures.append(future)
+    if not futures:
+        shutil.rmtree(scratch_dirpath, ignore_errors=True)
+    if owned_executor:
+        executor.shutdown(wait=False)
+    return futures
+
+def _log_snapshot(future):
+    """
+    Log the outcome of a snapshot task.
+    """
+    try:
+        logging.info(f'Saved snapshot "{future.result()}".')
+    except Exception as e:
+        logging.error(f'Failed to save snapshot.\nError Details: {e}')
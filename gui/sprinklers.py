@@ -19,8 +19,13 @@ along with this program. If not, see <https://www.gnu.org/licenses/>.
 """
 
 import numpy as np
-import pandas as pd
 from argparse import Namespace
+import tracemalloc
+import tempfile
+import weakref
+import time
+import os
+from utils import content_key
 
 def Pr_table_to_grid(Pr_table):
     """
@@ -36,12 +41,20 @@ def Pr_table_to_grid(Pr_table):
     """
     if Pr_table is None:
         return np.zeros((2,2)), 1
-    Pr_table = pd.DataFrame(Pr_table)
-    Pr_table.dropna(axis=0, how='all', inplace=True)
-    Pr_table.dropna(axis=1, how='all', inplace=True)
-    Pr_grid  = Pr_table.pivot(columns=0, index=1, values=2)
-    Pr_step  = Pr_grid.index[:2].diff()[-1]
-    Pr_grid  = Pr_grid.values
+    Pr_table = np.asarray(Pr_table, dtype=float)
+    nan_mask = np.isnan(Pr_table)
+    Pr_table = Pr_table[~nan_mask.all(axis=1)]
+    Pr_table = Pr_table[:, ~nan_mask.all(axis=0)]
+    
+    x_values, x_indices = np.unique(Pr_table[:,0], return_inverse=True)
+    y_values, y_indices = np.unique(Pr_table[:,1], return_inverse=True)
+    flat_indices = y_indices * x_values.size + x_indices
+    if np.unique(flat_indices).size != flat_indices.size:
+        raise ValueError('Pr table contains duplicate (x, y) positions.')
+    
+    Pr_grid = np.full((y_values.size, x_values.size), np.nan)
+    Pr_grid.flat[flat_indices] = Pr_table[:,2]
+    Pr_step = (y_values[1] - y_values[0]).item() if y_values.size > 1 else np.nan
     return Pr_grid, Pr_step
 
 def Pr_grid_to_table(Pr_grid, Pr_step):
@@ -55,15 +68,14 @@ def Pr_grid_to_table(Pr_grid, Pr_step):
     Returns:
         Pr_table (np.ndarray): Flattened table with columns [x, y, Pr_value]
     """
-    index, columns = map(
-        lambda axis: Pr_step * np.arange(Pr_grid.shape[axis]),
-        (0,1)
-    )
-    Pr_grid = pd.DataFrame(Pr_grid, index, columns)
-    Pr_grid.reset_index(inplace=True, names=['1'])
-    Pr_table = Pr_grid.melt(id_vars=['1'], var_name='0', value_name='2')
-    Pr_table.sort_index(axis=1, inplace=True)
-    Pr_table = Pr_table.values
+    rows, cols = Pr_grid.shape
+    y_positions = Pr_step * np.arange(rows)
+    x_positions = Pr_step * np.arange(cols)
+    Pr_table = np.stack([
+        np.repeat(x_positions, rows),
+        np.tile(y_positions, cols),
+        Pr_grid.T.ravel(),
+    ], axis=1)
     return Pr_table
 
 def Pr_table_to_quadrant(Pr_table, resolution):
@@ -103,6 +115,15 @@ def Pr_table_to_quadrant(Pr_table, resolution):
             Pr_quadrant[y_min : y_max, x_min : x_max] = Pr
     return Pr_quadrant
 
+def _catch_can_labels(Pr_table, resolution):
+    """
+    Label each pixel of the Pr quadrant with the 1-based row of the Pr table it takes
+    its value from, or 0 for none, by running `Pr_table_to_quadrant` on the row numbers.
+    """
+    labels_table = np.array(Pr_table, dtype=float)
+    labels_table[:, -1] = np.arange(1, len(labels_table) + 1)
+    return Pr_table_to_quadrant(labels_table, resolution).astype('int')
+
 def generate_sliding_window(configuration_pixels, is_triangle):
     """
     Generate a boolean sliding window array representing sprinkler positions
@@ -188,7 +209,32 @@ def Pr_quadrant_to_plot(Pr_quadrant):
     Pr_plot[step_y:, step_x:] = Pr_quadrant
     return Pr_plot
 
-def Pr_plot_to_zone(Pr_plot, sprinklers_mask):
+def allocate_zone(zone_pixels, dirpath=None):
+    """
+    Allocate a zero-filled float64 zone buffer, in memory or backed by a file.
+
+    File-backed buffers are np.memmap's of a scratch file created in `dirpath`,
+    whose path is available as the buffer's `filename` attribute for handing the
+    zone over to other tools. The file is removed once the buffer is garbage collected.
+
+    Parameters:
+        zone_pixels (tuple[int, int]): Size of the zone in pixels (height, width).
+        dirpath (str): Scratch directory for a file-backed buffer, or None for an in-memory one.
+
+    Returns:
+        Pr_zone (np.ndarray or np.memmap): Zero-filled 2D array of shape `zone_pixels`.
+    """
+    zone_pixels = tuple(int(x) for x in zone_pixels)
+    if dirpath is None:
+        return np.zeros(zone_pixels)
+    os.makedirs(dirpath, exist_ok=True)
+    fd, filepath = tempfile.mkstemp(suffix='.zone', dir=dirpath)
+    os.close(fd)
+    Pr_zone = np.memmap(filepath, dtype=np.float64, mode='w+', shape=zone_pixels)
+    weakref.finalize(Pr_zone, os.remove, filepath)
+    return Pr_zone
+
+def Pr_plot_to_zone(Pr_plot, sprinklers_mask, out=None):
     """
     Map a full Pr plot to the sprinkler zone by adding contributions
     from each sprinkler location.
@@ -196,13 +242,15 @@ def Pr_plot_to_zone(Pr_plot, sprinklers_mask):
     Parameters:
         Pr_plot (np.ndarray): 2D array of precipitation distribution around a sprinkler.
         sprinklers_mask (np.ndarray): Boolean 2D array indicating sprinkler positions.
+        out (np.ndarray): Optional zero-filled buffer of the mask's shape to accumulate into,
+                          e.g. a file-backed one from `allocate_zone`.
 
     Returns:
         Pr_zone (np.ndarray): 2D array representing the total Pr over the zone.
     """
     step_y, step_x = np.array(Pr_plot.shape) // 2
     yx_sprinklers = np.stack(np.where(sprinklers_mask), axis=1)
-    Pr_zone       = np.zeros(sprinklers_mask.shape)
+    Pr_zone       = np.zeros(sprinklers_mask.shape) if out is None else out
     for y, x in yx_sprinklers:
         y_min, y_max = y - step_y, y + step_y
         x_min, x_max = x - step_x, x + step_x
@@ -220,7 +268,7 @@ def Pr_plot_to_zone(Pr_plot, sprinklers_mask):
             x_min = 0
         zone_portion = Pr_zone[y_min : y_max, x_min : x_max]
         zone_portion_h, zone_portion_w = zone_portion.shape
-        Pr_zone[y_min : y_max, x_min : x_max] = zone_portion + plot_portion[:zone_portion_h, :zone_portion_w]
+        zone_portion += plot_portion[:zone_portion_h, :zone_portion_w]
     return Pr_zone
 
 def Pr_zone_to_homogenous_plot(Pr_zone, sliding_window, is_triangle):
@@ -247,7 +295,72 @@ def Pr_zone_to_homogenous_plot(Pr_zone, sliding_window, is_triangle):
         homogenous_plot = Pr_zone[:window_h, :window_w]
     return homogenous_plot
     
-def compute_DU(Pr_homogenous_plot):
+def _weighted_quantile(values, weights, q):
+    """
+    Quantile of values repeated by integer weights, equal to `np.quantile` (linear
+    method) of the repeated values without materializing them.
+    """
+    order = np.argsort(values, axis=None)
+    sorted_values = values.ravel()[order]
+    counts = np.cumsum(weights.ravel()[order])
+    position = q * (counts[-1] - 1)
+    lower, upper = np.searchsorted(counts, [np.floor(position), np.ceil(position)], side='right')
+    fraction = position - np.floor(position)
+    return sorted_values[lower] + fraction * (sorted_values[upper] - sorted_values[lower])
+
+def build_integral_images(Pr_zone):
+    """
+    Build the summed-area tables of a zone: of its values, their squares and its
+    wetted (Pr > 0) pixels, each padded with a leading row and column of zeros.
+
+    Parameters:
+        Pr_zone (np.ndarray): 2D array representing the total Pr over the zone.
+
+    Returns:
+        Namespace: `sum`, `squares` and `wetted` arrays of shape (h + 1, w + 1).
+    """
+    def integral(image, dtype):
+        table = np.zeros((image.shape[0] + 1, image.shape[1] + 1), dtype=dtype)
+        np.cumsum(image, axis=0, dtype=dtype, out=table[1:, 1:])
+        np.cumsum(table[1:, 1:], axis=1, out=table[1:, 1:])
+        return table
+    return Namespace(
+        sum     = integral(Pr_zone, np.float64),
+        squares = integral(np.square(Pr_zone, dtype=np.float64), np.float64),
+        wetted  = integral(Pr_zone > 0, np.int64),
+    )
+
+def query_region(integral, y_min, y_max, x_min, x_max):
+    """
+    Statistics of the zone's rectangle [y_min, y_max) x [x_min, x_max) in O(1),
+    from its summed-area tables.
+
+    Parameters:
+        integral (Namespace): The tables built by `build_integral_images`.
+        y_min, y_max, x_min, x_max (int): Pixel bounds, clipped to the zone.
+
+    Returns:
+        Namespace: `pixels`, `mean`, `variance`, `std` and `coverage` (wetted fraction)
+                   of the rectangle, or None if it is empty.
+    """
+    h, w = np.array(integral.sum.shape) - 1
+    y_min, y_max = np.clip([y_min, y_max], 0, h)
+    x_min, x_max = np.clip([x_min, x_max], 0, w)
+    pixels = int((y_max - y_min) * (x_max - x_min))
+    if pixels <= 0:
+        return None
+    rectangle_sum = lambda table: table[y_max, x_max] - table[y_min, x_max] - table[y_max, x_min] + table[y_min, x_min]
+    mean = rectangle_sum(integral.sum) / pixels
+    variance = max(rectangle_sum(integral.squares) / pixels - mean ** 2, 0.0)
+    return Namespace(
+        pixels   = pixels,
+        mean     = float(mean),
+        variance = float(variance),
+        std      = float(np.sqrt(variance)),
+        coverage = float(rectangle_sum(integral.wetted) / pixels),
+    )
+
+def compute_DU(Pr_homogenous_plot, weights=None):
     """
     Compute the Distribution Uniformity (DU) of a precipitation plot.
 
@@ -257,22 +370,28 @@ def compute_DU(Pr_homogenous_plot):
     Parameters:
         Pr_homogenous_plot (np.ndarray): 2D array representing precipitation
                                          over a homogeneous plot of the sprinkler layout.
+        weights (np.ndarray): Optional integer multiplicity of each value, e.g. for
+                              the symmetric part of a repeat cell (see `evaluate_repeat_cell`).
 
     Returns:
         DU (float): Distribution uniformity in percentage. Returns np.nan
                     if no lowest-quartile values exist.
     """
-    LQ_mask = Pr_homogenous_plot < np.quantile(Pr_homogenous_plot, 0.25)
+    if weights is None:
+        LQ_threshold = np.quantile(Pr_homogenous_plot, 0.25)
+    else:
+        LQ_threshold = _weighted_quantile(Pr_homogenous_plot, weights, 0.25)
+    LQ_mask = Pr_homogenous_plot < LQ_threshold
     if not LQ_mask.any():
         return np.nan
-    LQ_height = np.mean(Pr_homogenous_plot[LQ_mask])
-    mean_height = np.mean(Pr_homogenous_plot)
+    LQ_height = np.average(Pr_homogenous_plot[LQ_mask], weights=None if weights is None else weights[LQ_mask])
+    mean_height = np.average(Pr_homogenous_plot, weights=weights)
     eps = np.finfo(mean_height.dtype).eps
     DU = round(LQ_height / (mean_height + eps) * 100, 2)
     DU = DU.item()
     return DU
     
-def compute_CU(Pr_homogenous_plot):
+def compute_CU(Pr_homogenous_plot, weights=None):
     """
     Compute the Christiansen Uniformity (CU) of a precipitation plot.
 
@@ -282,11 +401,19 @@ def compute_CU(Pr_homogenous_plot):
     Parameters:
         Pr_homogenous_plot (np.ndarray): 2D array representing precipitation
                                          over a homogeneous plot of the sprinkler layout.
+        weights (np.ndarray): Optional integer multiplicity of each value (see `compute_DU`).
 
     Returns:
         CU (float): Christiansen Uniformity percentage. Returns np.nan if
                     CU is negative due to numerical errors.
     """
+    if weights is not None:
+        mean_height = np.average(Pr_homogenous_plot, weights=weights)
+        eps = np.finfo(mean_height.dtype).eps
+        deviation = np.sum(weights * np.abs(Pr_homogenous_plot - mean_height))
+        CU = round(100 * (1 - deviation / (np.sum(weights) * mean_height + eps)), 2)
+        CU = CU.item()
+        return np.nan if CU < 0.0 else CU
     mean_height = np.mean(Pr_homogenous_plot)
     eps = np.finfo(mean_height.dtype).eps
     CU = round(100 * (1 - np.sum(np.abs(Pr_homogenous_plot - mean_height)) / (Pr_homogenous_plot.size * mean_height + eps)), 2)
@@ -295,7 +422,515 @@ def compute_CU(Pr_homogenous_plot):
         return np.nan
     return CU
 
-def evaluate(resolution:int, zone_meters:tuple, configuration_meters:tuple, Pr_table:np.ndarray):
+def metrics_gradients(Pr_homogenous_plot):
+    """
+    Compute the gradients of CU and DU with respect to each value of a plot.
+
+    The gradients are those of the unrounded metrics of `compute_CU` and `compute_DU`,
+    in percentage points per unit of Pr; the lowest quartile is taken as fixed, as it
+    is locally unless values tie at its threshold.
+
+    Parameters:
+        Pr_homogenous_plot (np.ndarray): 2D array representing precipitation
+                                         over a homogeneous plot of the sprinkler layout.
+
+    Returns:
+        Namespace: Contains `CU` and `DU`, arrays of the plot's shape.
+    """
+    n = Pr_homogenous_plot.size
+    mean_height = np.mean(Pr_homogenous_plot)
+    eps = np.finfo(mean_height.dtype).eps
+    signs = np.sign(Pr_homogenous_plot - mean_height)
+    deviation = np.sum(np.abs(Pr_homogenous_plot - mean_height))
+    CU = -100 * ((signs - signs.mean()) / (n * mean_height + eps) - deviation / (n * mean_height ** 2 + eps) / n)
+
+    LQ_mask = Pr_homogenous_plot < np.quantile(Pr_homogenous_plot, 0.25)
+    if LQ_mask.any():
+        LQ_height = np.mean(Pr_homogenous_plot[LQ_mask])
+        DU = 100 * (LQ_mask / (LQ_mask.sum() * mean_height + eps) - LQ_height / (n * mean_height ** 2 + eps))
+    else:
+        DU = np.full(Pr_homogenous_plot.shape, np.nan)
+    return Namespace(CU=CU, DU=DU)
+
+def repeat_cell_lattice(configuration_pixels, is_triangle):
+    """
+    Describe the sprinkler lattice laid out by `generate_sprinklers_mask` as a
+    periodic repeat cell.
+
+    The mirrored kernel of `Pr_quadrant_to_plot` is symmetric about its center
+    half a pixel before the sprinkler, so the field of the lattice is mirror-symmetric
+    along an axis (pixel r ↔ period - 1 - r) whenever the sprinklers are. That holds
+    along both axes for rectangles, and for triangles only across x and when the
+    side is odd in pixels (the staggered rows are off-center by half a pixel).
+
+    Parameters:
+        configuration_pixels (np.ndarray): [height, width] or [side_length] for triangle.
+        is_triangle (bool): Flag indicating if the configuration is triangular.
+
+    Returns:
+        Namespace: Contains
+            - period (tuple[int, int]): Cell size in pixels (height, width).
+            - sites (list[tuple[int, int]]): Sprinkler positions within the cell.
+            - mirrored (tuple[bool, bool]): Whether the field is mirror-symmetric along y and x.
+    """
+    window_h, window_w = generate_sliding_window(configuration_pixels, is_triangle).shape
+    period = (window_h - 1, window_w - 1)
+    if is_triangle:
+        sites = [(0, window_w // 2), (window_h // 2, 0)]
+        mirrored = (False, window_w % 2 == 1)
+    else:
+        sites = [(0, 0)]
+        mirrored = (True, True)
+    return Namespace(period=period, sites=sites, mirrored=mirrored)
+
+def _fold_matrix(pixels, site, period, quadrant_size):
+    """
+    Count, for each pixel of a repeat cell along one axis, how many lattice sprinklers
+    reach it through each row (or column) of the Pr quadrant.
+
+    Returns:
+        np.ndarray: Matrix of shape (len(pixels), quadrant_size).
+    """
+    offsets = np.arange((pixels.min() - site - quadrant_size) // period - 1,
+                        (pixels.max() - site + quadrant_size) // period + 2)
+    distances = pixels[:, None] - site - offsets[None, :] * period
+    indices = np.where(distances >= 0, distances, -distances - 1)
+    rows, columns = np.nonzero(indices < quadrant_size)
+    fold = np.bincount(rows * quadrant_size + indices[rows, columns], minlength=pixels.size * quadrant_size)
+    return fold.reshape(pixels.size, quadrant_size).astype(float)
+
+def _repeat_cell_axes(lattice, symmetric):
+    """
+    Pixels of the computed part of a repeat cell along each axis, and the number of
+    cell pixels each stands for (see `evaluate_repeat_cell`).
+    """
+    axes_pixels, axes_weights = [], []
+    for period, mirrored in zip(lattice.period, lattice.mirrored):
+        if symmetric and mirrored:
+            pixels = np.arange((period + 1) // 2)
+            weights = np.full(pixels.size, 2)
+            if period % 2:
+                weights[-1] = 1
+        else:
+            pixels = np.arange(period)
+            weights = np.ones(period, dtype=int)
+        axes_pixels.append(pixels)
+        axes_weights.append(weights)
+    return axes_pixels, axes_weights
+
+def evaluate_repeat_cell(resolution:int, configuration_meters:tuple, Pr_table:np.ndarray, symmetric:bool=True):
+    """
+    Evaluate the uniformity of the interior repeat cell of an unbounded sprinkler lattice.
+
+    Unlike `evaluate()`, whose homogeneous plot is cut at the zone's corner and thus
+    includes its edge effects, the cell is surrounded by sprinklers on all sides.
+    Its field is the Pr quadrant folded over the lattice's period, computed as a
+    product of small fold matrices without superposing over any zone. With
+    `symmetric`, only the irreducible part of the cell (a quarter for rectangles,
+    a half for triangles of odd side) is computed, and the metrics weigh each pixel
+    by the number of pixels it mirrors.
+
+    Parameters:
+        resolution, configuration_meters, Pr_table: See `evaluate()`.
+        symmetric (bool): Whether to exploit the cell's mirror symmetry.
+
+    Returns:
+        Namespace: Contains
+            - cell (np.ndarray): Pr over the computed part of the cell.
+            - weights (np.ndarray): Number of cell pixels each computed pixel stands for.
+            - metrics (Namespace): Contains Christiansen Uniformity (CU) and Distribution Uniformity (DU)
+    """
+    configuration_meters = np.array(configuration_meters[::-1])
+    is_triangle = configuration_meters.size == 1
+    configuration_pixels = (resolution * configuration_meters).astype('int')
+    lattice = repeat_cell_lattice(configuration_pixels, is_triangle)
+    Pr_quadrant = Pr_table_to_quadrant(Pr_table, resolution)
+
+    axes_pixels, axes_weights = _repeat_cell_axes(lattice, symmetric)
+    cell = np.zeros((axes_pixels[0].size, axes_pixels[1].size))
+    for site_y, site_x in lattice.sites:
+        fold_y = _fold_matrix(axes_pixels[0], site_y, lattice.period[0], Pr_quadrant.shape[0])
+        fold_x = _fold_matrix(axes_pixels[1], site_x, lattice.period[1], Pr_quadrant.shape[1])
+        cell += fold_y @ Pr_quadrant @ fold_x.T
+    weights = np.outer(*axes_weights)
+    return Namespace(
+        cell    = cell,
+        weights = weights,
+        metrics = Namespace(DU=compute_DU(cell, weights), CU=compute_CU(cell, weights)),
+    )
+
+def _batched_metrics(cells, weights):
+    """
+    Unrounded CU and DU of each column of `cells`, weighted by the integer `weights`
+    of its rows, as `compute_CU` and `compute_DU` compute them for a single plot.
+    """
+    total_weight = weights.sum()
+    mean_heights = weights @ cells / total_weight
+    eps = np.finfo(cells.dtype).eps
+    deviations = weights @ np.abs(cells - mean_heights)
+    CU = 100 * (1 - deviations / (total_weight * mean_heights + eps))
+    CU[CU < 0] = np.nan
+
+    order = np.argsort(cells, axis=0)
+    sorted_cells = np.take_along_axis(cells, order, axis=0)
+    counts = np.cumsum(weights[order], axis=0)
+    position = 0.25 * (total_weight - 1)
+    lower = (counts <= np.floor(position)).sum(axis=0, keepdims=True)
+    upper = (counts <= np.ceil(position)).sum(axis=0, keepdims=True)
+    lower_values, upper_values = (np.take_along_axis(sorted_cells, i, axis=0)[0] for i in (lower, upper))
+    LQ_thresholds = lower_values + (position - np.floor(position)) * (upper_values - lower_values)
+    LQ_weights = weights[:, None] * (cells < LQ_thresholds)
+    LQ_totals = LQ_weights.sum(axis=0)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        LQ_heights = np.where(LQ_totals > 0, (LQ_weights * cells).sum(axis=0) / LQ_totals, np.nan)
+    DU = 100 * LQ_heights / (mean_heights + eps)
+    return Namespace(CU=CU, DU=DU)
+
+def evaluate_uncertainty(resolution:int, configuration_meters:tuple, Pr_table:np.ndarray, relative_error:float=0.05,
+                         samples:int=1000, percentiles:tuple=(5, 50, 95), seed:int=None):
+    """
+    Estimate the uncertainty of the interior repeat cell's CU and DU due to catch-can
+    measurement errors, by Monte Carlo.
+
+    Each sample perturbs every catch-can independently by a Gaussian relative error
+    (clipped at zero Pr). The cell is linear in the Pr values, so the symmetric part
+    of the cell (see `evaluate_repeat_cell`) is computed once per catch-can, and all
+    the samples are evaluated at once as a single matrix product followed by batched
+    metrics, instead of one pipeline per sample. As the Pr quadrant is constant over
+    each catch-can's block, cell rows (and columns) reached through the same blocks
+    hold equal values in every sample; each group of them is computed once and weighed
+    by its size, which keeps the cost independent of the resolution.
+
+    Parameters:
+        resolution, configuration_meters, Pr_table: See `evaluate()`.
+        relative_error (float): Standard deviation of the measurement errors, relative to the readings.
+        samples (int): Number of noisy realizations of the Pr table.
+        percentiles (tuple[float]): Percentiles of each metric to report.
+        seed (int): Optional seed of the random generator, for reproducible bands.
+
+    Returns:
+        Namespace: Contains
+            - nominal (Namespace): CU and DU of the measured Pr table (see `evaluate_repeat_cell`).
+            - CU, DU (Namespace): Each contains
+                - mean (float), std (float): Mean and standard deviation over the samples.
+                - percentiles (dict[float, float]): The requested percentiles.
+                - values (np.ndarray): The metric of each sample (NaN where it is undefined).
+    """
+    Pr_table = np.asarray(Pr_table, dtype=float)
+    nominal = evaluate_repeat_cell(resolution, configuration_meters, Pr_table)
+
+    configuration_meters = np.array(configuration_meters[::-1])
+    is_triangle = configuration_meters.size == 1
+    configuration_pixels = (resolution * configuration_meters).astype('int')
+    lattice = repeat_cell_lattice(configuration_pixels, is_triangle)
+    labels = _catch_can_labels(Pr_table, resolution)
+    row_labels, label_rows = np.unique(labels, axis=0, return_inverse=True)
+    block_labels, label_columns = np.unique(row_labels, axis=1, return_inverse=True)
+
+    axes_folds, axes_weights = [], []
+    for axis, (pixels, weights, blocks) in enumerate(zip(*_repeat_cell_axes(lattice, True), (label_rows, label_columns))):
+        folds = np.hstack([
+            _fold_matrix(pixels, site[axis], lattice.period[axis], blocks.size) @ np.eye(blocks.max() + 1)[blocks.ravel()]
+            for site in lattice.sites
+        ])
+        folds, groups = np.unique(folds, axis=0, return_inverse=True)
+        axes_folds.append(np.split(folds, len(lattice.sites), axis=1))
+        axes_weights.append(np.bincount(groups.ravel(), weights=weights).astype(int))
+
+    catch_cans = np.eye(len(Pr_table) + 1)[block_labels][..., 1:]
+    basis = sum(np.einsum('yi,ijc,xj->yxc', fold_y, catch_cans, fold_x, optimize=True) for fold_y, fold_x in zip(*axes_folds))
+
+    generator = np.random.default_rng(seed)
+    noise = generator.standard_normal((len(Pr_table), samples))
+    noisy_Pr = np.clip(Pr_table[:, -1:] * (1 + relative_error * noise), 0, None)
+    cells = basis.reshape(-1, len(Pr_table)) @ noisy_Pr
+    metrics = _batched_metrics(cells, np.outer(*axes_weights).ravel())
+
+    summaries = {}
+    for name, values in vars(metrics).items():
+        defined = values[~np.isnan(values)]
+        bands = np.percentile(defined, percentiles) if defined.size else np.full(len(percentiles), np.nan)
+        summaries[name] = Namespace(
+            mean        = float(defined.mean()) if defined.size else np.nan,
+            std         = float(defined.std()) if defined.size else np.nan,
+            percentiles = dict(zip(percentiles, map(float, bands))),
+            values      = values,
+        )
+    return Namespace(nominal=nominal.metrics, **summaries)
+
+def estimate_peak_bytes(resolution, zone_meters, configuration_meters, Pr_table, zone_dirpath=None):
+    """
+    Estimate the peak memory of `evaluate()` from its inputs, without allocating any array.
+
+    The estimate adds up the float64 zone (unless file-backed), the boolean sprinklers mask,
+    the Pr quadrant, the mirrored Pr plot and its per-sprinkler copy, and the temporaries
+    of the metrics over the homogeneous plot.
+
+    Parameters:
+        resolution, zone_meters, configuration_meters, Pr_table, zone_dirpath: See `evaluate()`.
+
+    Returns:
+        int: Estimated peak bytes.
+    """
+    zone_pixels = np.prod((resolution * np.array(zone_meters)).astype('int'), dtype=float)
+    window_pixels = np.prod((resolution * np.array(configuration_meters)).astype('int'), dtype=float)
+    if len(configuration_meters) == 1:
+        window_pixels = 2 * 0.866 * window_pixels ** 2
+    if Pr_table is None:
+        quadrant_pixels = 4.0
+    else:
+        extent_meters = np.nanmax(np.asarray(Pr_table, dtype=float)[:, :2], axis=0)
+        quadrant_pixels = np.prod((resolution * extent_meters).astype('int'), dtype=float)
+
+    zone_bytes = 0 if zone_dirpath is not None else 8 * zone_pixels
+    mask_bytes = zone_pixels
+    plot_bytes = 8 * quadrant_pixels * (1 + 4 + 4)
+    metrics_bytes = 8 * window_pixels * 4
+    return int(zone_bytes + mask_bytes + plot_bytes + metrics_bytes)
+
+def fit_resolution(resolution, zone_meters, configuration_meters, Pr_table, budget_bytes, zone_dirpath=None):
+    """
+    Find the highest resolution, at most `resolution`, whose estimated peak memory fits the budget.
+
+    Parameters:
+        resolution, zone_meters, configuration_meters, Pr_table, zone_dirpath: See `evaluate()`.
+        budget_bytes (int): Memory budget in bytes.
+
+    Returns:
+        int: The fitting resolution, or None if not even 1 pixel per meter fits.
+    """
+    estimate = lambda r: estimate_peak_bytes(r, zone_meters, configuration_meters, Pr_table, zone_dirpath)
+    peak_bytes = estimate(resolution)
+    if peak_bytes <= budget_bytes:
+        return resolution
+    # The peak grows with the square of the resolution, so start just above the scaled guess
+    resolution = min(resolution, int(resolution * np.sqrt(budget_bytes / peak_bytes)) + 1)
+    while resolution >= 1 and estimate(resolution) > budget_bytes:
+        resolution -= 1
+    return resolution if resolution >= 1 else None
+
+def metrics_zone_meters(resolution, zone_meters, configuration_meters, Pr_table):
+    """
+    Crop the zone to the corner that determines the metrics.
+
+    The homogeneous plot is cut at the zone's corner, so only the sprinklers within
+    reach of it (the Pr table's extent) contribute to CU and DU. Evaluating a zone
+    cropped to 2.5 windows plus that reach gives the same metrics as the full zone.
+
+    Parameters:
+        resolution, zone_meters, configuration_meters, Pr_table: See `evaluate()`.
+
+    Returns:
+        tuple[float, float]: The cropped zone dimensions (width, height) in meters.
+    """
+    if len(configuration_meters) == 1:
+        window_meters = np.array([configuration_meters[0], 2 * 0.866 * configuration_meters[0]])
+    else:
+        window_meters = np.array(configuration_meters, dtype=float)
+    reach_meters = 0.0 if Pr_table is None else np.nanmax(np.asarray(Pr_table, dtype=float)[:, :2])
+    needed_meters = 2.5 * window_meters + reach_meters + 2 / resolution
+    return tuple(float(min(zone, needed)) for zone, needed in zip(zone_meters, needed_meters))
+
+def richardson_extrapolate(resolutions, values):
+    """
+    Extrapolate a metric to infinite resolution from its values at the last three resolutions.
+
+    The discretization error is modeled as C * h^p with h = 1 / resolution, the order p
+    being estimated from the three values (clamped to [0.5, 4]). If the differences are
+    not monotonically shrinking, there is no asymptotic trend to extrapolate and the
+    finest value is returned.
+
+    Parameters:
+        resolutions (list[int]): Increasing resolutions, at least 3.
+        values (list[float]): The metric at each resolution.
+
+    Returns:
+        float: The extrapolated metric.
+    """
+    (r1, r2, r3), (m1, m2, m3) = resolutions[-3:], values[-3:]
+    d1, d2 = m2 - m1, m3 - m2
+    if d1 * d2 <= 0 or abs(d2) >= abs(d1):
+        return m3
+    order = np.clip(np.log(d1 / d2) / np.log(r2 / r1), 0.5, 4)
+    return float(m3 + d2 / ((r3 / r2) ** order - 1))
+
+def converge_resolution(zone_meters, configuration_meters, Pr_table, tolerance=0.1,
+                        minimum=5, maximum=100, factor=2 ** 0.5):
+    """
+    Find the lowest resolution whose CU and DU are within a tolerance of their
+    extrapolated values at infinite resolution.
+
+    The metrics are evaluated at geometrically increasing resolutions on the zone
+    corner that determines them (see `metrics_zone_meters`) and extrapolated with
+    `richardson_extrapolate`. The search stops once two successive extrapolations agree
+    within the tolerance, and selects the lowest resolution that, with every finer one
+    evaluated after it (at least two), is within the tolerance of the extrapolation.
+
+    Parameters:
+        zone_meters, configuration_meters, Pr_table: See `evaluate()`.
+        tolerance (float): Accepted deviation of CU and DU in percentage points.
+        minimum, maximum (int): Range of the resolutions to try.
+        factor (float): Ratio between successive resolutions.
+
+    Returns:
+        Namespace: Contains
+            - resolution (int): The selected resolution, `maximum` if not converged.
+            - converged (bool): Whether the tolerance was met below `maximum`.
+            - metrics (Namespace): CU and DU at the selected resolution.
+            - extrapolated (Namespace): CU and DU extrapolated to infinite resolution.
+            - error (float): Deviation of the selected metrics from the extrapolation, or if
+                             not converged, of the last three evaluations.
+            - history (list[Namespace]): `resolution`, `CU` and `DU` of every evaluation.
+    """
+    resolutions = sorted({int(round(minimum * factor ** k)) for k in range(int(np.log(maximum / minimum) / np.log(factor)) + 1)} | {maximum})
+    resolutions = [r for r in resolutions if minimum <= r <= maximum]
+    history = []
+    extrapolations = []
+    deviation = lambda h, limit: max(abs(h.CU - limit.CU), abs(h.DU - limit.DU))
+    for resolution in resolutions:
+        cropped_zone_meters = metrics_zone_meters(resolution, zone_meters, configuration_meters, Pr_table)
+        with np.errstate(all='ignore'):
+            metrics = evaluate(resolution, cropped_zone_meters, tuple(configuration_meters), Pr_table).metrics
+        history.append(Namespace(resolution=resolution, CU=metrics.CU, DU=metrics.DU))
+        if len(history) < 3:
+            continue
+        extrapolations.append(Namespace(**{
+            name: richardson_extrapolate([h.resolution for h in history], [getattr(h, name) for h in history])
+            for name in ('CU', 'DU')
+        }))
+        extrapolated = extrapolations[-1]
+        if len(extrapolations) < 2 or deviation(extrapolations[-2], extrapolated) > tolerance:
+            continue
+        for i, candidate in enumerate(history[:-2]):
+            if all(deviation(h, extrapolated) <= tolerance for h in history[i:]):
+                return Namespace(
+                    resolution   = candidate.resolution,
+                    converged    = True,
+                    metrics      = Namespace(CU=candidate.CU, DU=candidate.DU),
+                    extrapolated = extrapolated,
+                    error        = deviation(candidate, extrapolated),
+                    history      = history,
+                )
+    finest = history[-1]
+    extrapolated = extrapolations[-1] if extrapolations else Namespace(CU=finest.CU, DU=finest.DU)
+    return Namespace(
+        resolution   = finest.resolution,
+        converged    = False,
+        metrics      = Namespace(CU=finest.CU, DU=finest.DU),
+        extrapolated = extrapolated,
+        error        = max(deviation(h, extrapolated) for h in history[-3:]),
+        history      = history,
+    )
+
+def catch_can_lattice(configuration_meters, Pr_step):
+    """
+    Describe the sprinkler lattice on the catch-can grid, if the spacings are whole
+    multiples of the catch-can spacing.
+
+    Parameters:
+        configuration_meters (tuple[float] or tuple[float, float]): Sprinkler configuration dimensions.
+        Pr_step (float): Spacing between catch-cans in meters.
+
+    Returns:
+        Namespace: `period` (tuple[int, int], cell size in catch-cans along y and x) and
+                   `sites` (list[tuple[int, int]], sprinkler positions within the cell),
+                   or None if the lattice does not fall on the catch-can grid.
+    """
+    if not Pr_step or not np.isfinite(Pr_step):
+        return None
+    if len(configuration_meters) == 1:
+        side = configuration_meters[0]
+        spacings_meters = (2 * 0.866 * side, side, 0.866 * side, side / 2)
+    else:
+        width, height = configuration_meters
+        spacings_meters = (height, width)
+    spacings = np.array(spacings_meters) / Pr_step
+    if not np.allclose(spacings, np.round(spacings), rtol=0, atol=1e-6) or (np.round(spacings) < 1).any():
+        return None
+    spacings = np.round(spacings).astype(int).tolist()
+    if len(configuration_meters) == 1:
+        period_y, period_x, row_offset, column_offset = spacings
+        return Namespace(period=(period_y, period_x), sites=[(0, 0), (row_offset, column_offset)])
+    return Namespace(period=tuple(spacings), sites=[(0, 0)])
+
+def evaluate_catch_can(resolution:int, configuration_meters:tuple, Pr_table:np.ndarray):
+    """
+    Evaluate the interior repeat cell with the catch-can overlap method, directly on
+    the measurement grid, whenever the sprinkler spacings are whole multiples of the
+    catch-can spacing (see `catch_can_lattice`).
+
+    Each catch-can stands for the square of one catch-can spacing centered on it, as
+    in the raster of `Pr_table_to_quadrant`: the measurements are mirrored about the
+    sprinkler, whose own catch-can is at (0, 0), and end at the outermost catch-can's
+    position, which thus covers half its square. The cell is sampled at the centers
+    of the catch-cans' quarters, each summing the measurements found at its distances,
+    along each axis, from every sprinkler of the lattice, so that its metrics are those
+    of `evaluate_repeat_cell` in the limit of fine resolutions. Otherwise, the cell is
+    evaluated on the raster at the given resolution with `evaluate_repeat_cell`.
+
+    Parameters:
+        resolution, configuration_meters, Pr_table: See `evaluate()`.
+
+    Returns:
+        Namespace: Contains
+            - native (bool): Whether the catch-can grid was used.
+            - cell (np.ndarray): Pr over the cell, two samples per catch-can along each axis (or one per pixel).
+            - weights (np.ndarray): Multiplicity of each value (see `evaluate_repeat_cell`).
+            - metrics (Namespace): Contains Christiansen Uniformity (CU) and Distribution Uniformity (DU)
+    """
+    Pr_grid, Pr_step = Pr_table_to_grid(Pr_table)
+    lattice = None if Pr_table is None else catch_can_lattice(configuration_meters, Pr_step)
+    if lattice is None:
+        result = evaluate_repeat_cell(resolution, configuration_meters, Pr_table)
+        result.native = False
+        return result
+
+    Pr_grid = np.nan_to_num(Pr_grid)
+    cell = np.zeros(2 * np.array(lattice.period))
+    for site_y, site_x in lattice.sites:
+        folds = []
+        for period, site, grid_size in zip(lattice.period, (site_y, site_x), Pr_grid.shape):
+            positions = np.arange(2 * period) / 2 - 0.25
+            offsets = np.arange(-(grid_size // period) - 2, grid_size // period + 3)
+            distances = np.abs(positions[:, None] - site - offsets[None, :] * period)
+            rows, columns = np.nonzero(distances < grid_size - 1)
+            indices = np.rint(distances[rows, columns]).astype(int)
+            fold = np.bincount(rows * grid_size + indices, minlength=2 * period * grid_size)
+            folds.append(fold.reshape(2 * period, grid_size).astype(float))
+        cell += folds[0] @ Pr_grid @ folds[1].T
+    weights = np.ones(cell.shape, dtype=int)
+    return Namespace(
+        native  = True,
+        cell    = cell,
+        weights = weights,
+        metrics = Namespace(DU=compute_DU(cell), CU=compute_CU(cell)),
+    )
+
+def _run_stage(profile, name, function, *args):
+    """
+    Run a pipeline stage, recording its wall time, allocated bytes and output shape
+    in `profile` under `name`, unless `profile` is None.
+
+    The allocated bytes are the peak of the memory traced by `tracemalloc` during
+    the stage, above what was already allocated when it started.
+    """
+    if profile is None:
+        return function(*args)
+    was_tracing = tracemalloc.is_tracing()
+    if not was_tracing:
+        tracemalloc.start()
+    allocated_bytes = tracemalloc.get_traced_memory()[0]
+    tracemalloc.reset_peak()
+    start = time.perf_counter()
+    result = function(*args)
+    elapsed_ms = 1e3 * (time.perf_counter() - start)
+    peak_bytes = tracemalloc.get_traced_memory()[1] - allocated_bytes
+    if not was_tracing:
+        tracemalloc.stop()
+    setattr(profile, name, Namespace(ms=elapsed_ms, bytes=peak_bytes, shape=getattr(result, 'shape', ())))
+    return result
+
+def evaluate(resolution:int, zone_meters:tuple, configuration_meters:tuple, Pr_table:np.ndarray, zone_dirpath:str=None, profile:bool=False, memory_budget_bytes:int=None, integral:bool=False):
     """
     Evaluate sprinkler distribution uniformity given the layout and measurements.
 
@@ -306,12 +941,26 @@ def evaluate(resolution:int, zone_meters:tuple, configuration_meters:tuple, Pr_t
             - Single value → triangular layout (equilateral triangle)
             - Two values → rectangular layout
         Pr_table (np.ndarray): CSV table of precipitation measurements with positions and values.
+        zone_dirpath (str): Optional scratch directory; if given, the zone is a file-backed
+                            np.memmap created there (see `allocate_zone`) instead of an in-memory array.
+        profile (bool): If True, record the wall time, allocated bytes and output shape of each stage.
+        memory_budget_bytes (int): Optional memory budget; inputs whose estimated peak memory
+                                   (see `estimate_peak_bytes`) exceeds it raise a MemoryError
+                                   before anything is allocated.
+        integral (bool): If True, build the zone's summed-area tables for `query_region`.
 
     Returns:
         Namespace: Contains
+            - key (str): Content key of the inputs, equal for equal inputs.
             - zone (np.ndarray): Precipitation map over the zone.
             - homogenous_plot (np.ndarray): A quadrant slice representing a homogeneous plot.
+            - sprinklers_mask (np.ndarray): Boolean mask of sprinkler positions over the zone.
+            - homogenous_sprinklers_mask (np.ndarray): Sprinkler positions within the homogeneous plot.
             - metrics (Namespace): Contains Christiansen Uniformity (CU) and Distribution Uniformity (DU)
+            - profile (Namespace): Per-stage Namespaces of `ms`, `bytes` and `shape`, in pipeline order,
+                                   or None if `profile` is False.
+            - integral (Namespace): The zone's summed-area tables (see `build_integral_images`),
+                                    or None if `integral` is False.
     """
     assert type(resolution) is int, \
            '`resolution` should be an integer.'
@@ -326,6 +975,14 @@ def evaluate(resolution:int, zone_meters:tuple, configuration_meters:tuple, Pr_t
            all(type(x) in (int, float) for x in configuration_meters), \
            '`configuration_meters` should be a tuple of 1 or 2 numerical values.'
     
+    if memory_budget_bytes is not None:
+        peak_bytes = estimate_peak_bytes(resolution, zone_meters, configuration_meters, Pr_table, zone_dirpath)
+        if peak_bytes > memory_budget_bytes:
+            raise MemoryError(f'The evaluation needs about {peak_bytes / 1024**2:.0f} MiB, '
+                              f'over the {memory_budget_bytes / 1024**2:.0f} MiB memory budget.')
+    
+    key = content_key(resolution, zone_meters, configuration_meters, Pr_table)
+    
     zone_meters, configuration_meters = map(
         lambda x: np.array(x[::-1]), (zone_meters, configuration_meters)
     )
@@ -333,20 +990,84 @@ def evaluate(resolution:int, zone_meters:tuple, configuration_meters:tuple, Pr_t
     zone_pixels         = (resolution * zone_meters).astype('int')
     configuration_pixels = (resolution * configuration_meters).astype('int')
 
-    sliding_window  = generate_sliding_window(configuration_pixels, is_triangle)
-    sprinklers_mask = generate_sprinklers_mask(zone_pixels, sliding_window, is_triangle)
+    stages = Namespace() if profile else None
     
-    Pr_quadrant = Pr_table_to_quadrant(Pr_table, resolution)
-    Pr_plot     = Pr_quadrant_to_plot(Pr_quadrant)
+    sliding_window  = _run_stage(stages, 'sliding_window', generate_sliding_window, configuration_pixels, is_triangle)
+    sprinklers_mask = _run_stage(stages, 'sprinklers_mask', generate_sprinklers_mask, zone_pixels, sliding_window, is_triangle)
+    
+    Pr_quadrant = _run_stage(stages, 'Pr_quadrant', Pr_table_to_quadrant, Pr_table, resolution)
+    Pr_plot     = _run_stage(stages, 'Pr_plot', Pr_quadrant_to_plot, Pr_quadrant)
     
-    Pr_zone            = Pr_plot_to_zone(Pr_plot, sprinklers_mask)
-    Pr_homogenous_plot = Pr_zone_to_homogenous_plot(Pr_zone, sliding_window, is_triangle)
+    Pr_zone            = _run_stage(stages, 'zone', lambda: Pr_plot_to_zone(Pr_plot, sprinklers_mask, allocate_zone(zone_pixels, zone_dirpath)))
+    Pr_homogenous_plot = _run_stage(stages, 'homogenous_plot', Pr_zone_to_homogenous_plot, Pr_zone, sliding_window, is_triangle)
+    homogenous_sprinklers_mask = _run_stage(stages, 'homogenous_sprinklers_mask', Pr_zone_to_homogenous_plot, sprinklers_mask, sliding_window, is_triangle)
 
-    CU = compute_CU(Pr_homogenous_plot)
-    DU = compute_DU(Pr_homogenous_plot)
+    CU = _run_stage(stages, 'CU', compute_CU, Pr_homogenous_plot)
+    DU = _run_stage(stages, 'DU', compute_DU, Pr_homogenous_plot)
+    
+    integral_images = _run_stage(stages, 'integral', build_integral_images, Pr_zone) if integral else None
     
     return Namespace(
+        key             = key,
         zone            = Pr_zone,
         homogenous_plot = Pr_homogenous_plot,
-        metrics         = Namespace(DU=DU, CU=CU)
+        sprinklers_mask = sprinklers_mask,
+        homogenous_sprinklers_mask = homogenous_sprinklers_mask,
+        metrics         = Namespace(DU=DU, CU=CU),
+        profile         = stages,
+        integral        = integral_images,
     )
+
+def compute_sensitivity(resolution:int, zone_meters:tuple, configuration_meters:tuple, Pr_table:np.ndarray, result:Namespace=None):
+    """
+    Compute the sensitivity of CU and DU to each catch-can measurement of the Pr table.
+
+    The homogeneous plot is a linear function of the Pr values: each quadrant pixel
+    takes the value of one catch-can, the quadrant is mirrored into the plot, and the
+    plot is superposed at every sprinkler. The gradients of the metrics with respect
+    to the homogeneous plot (see `metrics_gradients`) are therefore carried back to the
+    catch-cans in a single pass through the transpose of each stage, at most the cost
+    of one evaluation, instead of one evaluation per perturbed catch-can.
+
+    Parameters:
+        resolution, zone_meters, configuration_meters, Pr_table: See `evaluate()`.
+        result (Namespace): The result of `evaluate()` for these inputs, evaluated if None.
+
+    Returns:
+        Namespace: Contains
+            - CU (np.ndarray): d(CU)/d(Pr) of each catch-can, in percentage points per unit of Pr,
+                               laid out as the grid of `Pr_table_to_grid`.
+            - DU (np.ndarray): d(DU)/d(Pr) of each catch-can, likewise.
+    """
+    if result is None:
+        result = evaluate(resolution, zone_meters, configuration_meters, Pr_table)
+    configuration_meters = np.array(configuration_meters[::-1])
+    is_triangle = configuration_meters.size == 1
+    configuration_pixels = (resolution * configuration_meters).astype('int')
+    window_h, window_w = generate_sliding_window(configuration_pixels, is_triangle).shape
+    origin_y, origin_x = (0, window_w // 2) if is_triangle else (0, 0)
+
+    Pr_table = np.asarray(Pr_table, dtype=float)
+    labels = _catch_can_labels(Pr_table, resolution)
+    step_y, step_x = labels.shape
+
+    plot_h, plot_w = result.homogenous_plot.shape
+    gradients = {}
+    for metric, plot_gradient in vars(metrics_gradients(result.homogenous_plot)).items():
+        Pr_plot_gradient = np.zeros((2 * step_y, 2 * step_x))
+        for y, x in np.stack(np.where(result.sprinklers_mask), axis=1):
+            y_min, y_max = max(origin_y, y - step_y), min(origin_y + plot_h, y + step_y)
+            x_min, x_max = max(origin_x, x - step_x), min(origin_x + plot_w, x + step_x)
+            if y_min >= y_max or x_min >= x_max:
+                continue
+            Pr_plot_gradient[y_min - y + step_y : y_max - y + step_y, x_min - x + step_x : x_max - x + step_x] += \
+                plot_gradient[y_min - origin_y : y_max - origin_y, x_min - origin_x : x_max - origin_x]
+        quadrant_gradient = (
+            Pr_plot_gradient[step_y:, step_x:]
+            + Pr_plot_gradient[:step_y, step_x:][::-1]
+            + Pr_plot_gradient[step_y:, :step_x][:, ::-1]
+            + Pr_plot_gradient[:step_y, :step_x][::-1, ::-1]
+        )
+        table_gradient = np.bincount(labels.ravel(), weights=quadrant_gradient.ravel(), minlength=len(Pr_table) + 1)[1:]
+        gradients[metric], _ = Pr_table_to_grid(np.column_stack([Pr_table[:, :2], table_gradient]))
+    return Namespace(**gradients)
@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Sprinkler Distribution Evaluator - A Python tool to simulate and visualize sprinkler coverage
+Copyright (C) 2025 Mohamed Behery
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program. If not, see <https://www.gnu.org/licenses/>.
+"""
+
+from argparse import Namespace
+from datetime import datetime
+import sqlite3
+import os
+
+from sprinklers import Pr_table_to_grid
+from utils import content_key
+
+def Pr_table_hash(Pr_table):
+    """
+    Content hash of a Pr table's grid and step, so that the same measurements
+    hash equally whatever the row order or file format they were read from.
+
+    Parameters:
+        Pr_table (np.ndarray): Table of [x, y, Pr] rows, or None.
+
+    Returns:
+        str: 32-character hexadecimal digest
+    """
+    return content_key(*Pr_table_to_grid(Pr_table))
+
+class ResultsStore:
+    """
+    Persistent SQLite store of evaluation metrics, indexed by the evaluation inputs:
+    the Pr table hash, resolution, zone dimensions and sprinkler configuration.
+    """
+    SCHEMA = '''
+        CREATE TABLE IF NOT EXISTS results (
+            Pr_table_hash   TEXT    NOT NULL,
+            resolution      INTEGER NOT NULL,
+            zone_dim_meters TEXT    NOT NULL,
+            config_meters   TEXT    NOT NULL,
+            CU              REAL,
+            DU              REAL,
+            source          TEXT,
+            recorded_at     TEXT    NOT NULL
+        );
+        CREATE UNIQUE INDEX IF NOT EXISTS results_inputs
+            ON results (Pr_table_hash, resolution, zone_dim_meters, config_meters);
+    '''
+
+    def __init__(self, filepath):
+        filepath = os.path.abspath(filepath)
+        os.makedirs(os.path.dirname(filepath), exist_ok=True)
+        self.filepath = filepath
+        self.connection = sqlite3.connect(filepath)
+        self.connection.executescript(self.SCHEMA)
+
+    @staticmethod
+    def _inputs(resolution, zone_dim_meters, config_meters, Pr_table):
+        """
+        Normalize the evaluation inputs into the store's indexed column values.
+        """
+        serialize_floats = lambda floats: ', '.join(str(float(x)) for x in floats)
+        return Pr_table_hash(Pr_table), int(resolution), serialize_floats(zone_dim_meters), serialize_floats(config_meters)
+
+    def lookup(self, resolution, zone_dim_meters, config_meters, Pr_table):
+        """
+        Look up the metrics of a previous evaluation of the same inputs.
+
+        Parameters:
+            resolution, zone_dim_meters, config_meters, Pr_table: See `sprinklers.evaluate()`.
+
+        Returns:
+            Namespace: The stored metrics (CU, DU), or None if these inputs were never recorded.
+        """
+        row = self.connection.execute(
+            'SELECT CU, DU FROM results WHERE Pr_table_hash = ? AND resolution = ? AND zone_dim_meters = ? AND config_meters = ?',
+            self._inputs(resolution, zone_dim_meters, config_meters, Pr_table),
+        ).fetchone()
+        if row is None:
+            return None
+        CU, DU = (float('nan') if x is None else x for x in row)
+        return Namespace(DU=DU, CU=CU)
+
+    def record(self, resolution, zone_dim_meters, config_meters, Pr_table, metrics, source=''):
+        """
+        Record the metrics of an evaluation, replacing any previous record of the same inputs.
+
+        Parameters:
+            resolution, zone_dim_meters, config_meters, Pr_table: See `sprinklers.evaluate()`.
+            metrics (Namespace): The evaluation's metrics (CU, DU).
+            source (str): Free-form origin of the evaluation, e.g. the Pr table's filepath.
+        """
+        with self.connection:
+            self.connection.execute(
+                'INSERT OR REPLACE INTO results VALUES (?, ?, ?, ?, ?, ?, ?, ?)',
+                (*self._inputs(resolution, zone_dim_meters, config_meters, Pr_table),
+                 metrics.CU, metrics.DU, source, datetime.now().isoformat(timespec='seconds')),
+            )
+
+    def close(self):
+        self.connection.close()
@@ -20,10 +20,22 @@ along with this program. If not, see <https://www.gnu.org/licenses/>.
 
 from configparser import ConfigParser
 from argparse import Namespace
+from datetime import datetime
 import os
+from collections import deque
+import functools
+import cProfile
+import hashlib
+import pstats
+import atexit
+import io
 import numpy as np
 import pandas as pd
 import logging
+import glob
+import json
+import constants
+from PIL import Image, PngImagePlugin
 
 class INIParser(ConfigParser):
     """
@@ -46,6 +58,15 @@ class INIParser(ConfigParser):
         value = self.clean_inline_get(section, option)
         return int(value)
     
+    def getboolean(self, section, option):
+        """
+        Read a boolean value (1/yes/true/on or 0/no/false/off) from the config.
+        """
+        value = self.clean_inline_get(section, option).lower()
+        if value not in self.BOOLEAN_STATES:
+            raise ValueError(f'Not a boolean: {value}')
+        return self.BOOLEAN_STATES[value]
+    
     def gettuple(self, section, option, type_=float):
         """
         Read a comma-separated value and convert it into a tuple of the given type.
@@ -76,6 +97,152 @@ class INIParser(ConfigParser):
         """
         return os.path.abspath('./config.ini')
     
+class AdaptiveDelay:
+    """
+    Debounce delay that follows the measured cost of recent evaluations.
+
+    The delay is the mean of the last few recorded costs (evaluation + plotting)
+    scaled by a factor and clamped to [minimum_ms, maximum_ms], so that cheap
+    setups refresh quickly while heavy ones do not pile up evaluations.
+    """
+    def __init__(self, initial_ms, minimum_ms, maximum_ms, factor, history):
+        self.minimum_ms = minimum_ms
+        self.maximum_ms = maximum_ms
+        self.factor = factor
+        self.evaluate_ms = deque(maxlen=history)
+        self.plot_ms = deque(maxlen=history)
+        self._delay_ms = initial_ms
+    
+    @property
+    def delay_ms(self):
+        """
+        The current debounce delay in milliseconds.
+        """
+        return self._delay_ms
+    
+    @property
+    def cost_ms(self):
+        """
+        The mean total cost (evaluation + plotting) of the recorded runs in milliseconds.
+        """
+        if not self.evaluate_ms:
+            return 0.0
+        return (sum(self.evaluate_ms) + sum(self.plot_ms)) / len(self.evaluate_ms)
+    
+    def record(self, evaluate_ms, plot_ms):
+        """
+        Record the wall times of one evaluation and its plotting, then adapt the delay.
+        """
+        self.evaluate_ms.append(evaluate_ms)
+        self.plot_ms.append(plot_ms)
+        delay_ms = self.factor * self.cost_ms
+        self._delay_ms = int(min(self.maximum_ms, max(self.minimum_ms, delay_ms)))
+    
+def profiling_enabled():
+    """
+    Whether profiling is enabled, i.e. the `constants.Profiling.ENVVAR` environment
+    variable is set to 1/yes/true/on. Worker processes inherit the setting.
+    """
+    return os.environ.get(constants.Profiling.ENVVAR, '').strip().lower() in ('1', 'yes', 'true', 'on')
+
+def enable_profiling():
+    """
+    Enable profiling in this process and the processes it starts.
+    """
+    os.environ[constants.Profiling.ENVVAR] = '1'
+
+class SessionProfiler:
+    """
+    Per-process cProfile session shared by all the `profiled` functions.
+
+    Only outermost profiled calls enable the profiler, so nested profiled calls are
+    accounted once. After each of them, the cumulative stats are dumped to a `.prof`
+    file named after the session's start time and process ID, readable with `pstats`
+    or snakeviz, and a top-N summary is logged when the process exits.
+    """
+    _current = None
+    
+    def __init__(self, dirpath=constants.Profiling.DIRPATH, top_n=constants.Profiling.TOP_N):
+        os.makedirs(dirpath, exist_ok=True)
+        self.pid = os.getpid()
+        self.filepath = os.path.join(dirpath, f'{datetime.now():%Y%m%d-%H%M%S}-{self.pid}.prof')
+        self.top_n = top_n
+        self.profile = cProfile.Profile()
+        self.depth = 0
+        self.calls = 0
+        atexit.register(self.log_summary)
+    
+    @classmethod
+    def current(cls):
+        """
+        The session of this process if profiling is enabled, otherwise None.
+        """
+        if not profiling_enabled():
+            return None
+        if cls._current is None or cls._current.pid != os.getpid():
+            cls._current = cls()
+        return cls._current
+    
+    def call(self, function, *args, **kwargs):
+        """
+        Call a function under the session's profiler.
+        """
+        if self.depth == 0:
+            self.profile.enable()
+        self.depth += 1
+        try:
+            return function(*args, **kwargs)
+        finally:
+            self.depth -= 1
+            if self.depth == 0:
+                self.profile.disable()
+                self.calls += 1
+                try:
+                    self.profile.dump_stats(self.filepath)
+                except Exception as e:
+                    logging.error(f'Failed to write profile "{self.filepath}".\nError Details: {e}')
+    
+    def log_summary(self):
+        """
+        Log the top-N functions of the session by cumulative time.
+        """
+        if not self.calls:
+            return
+        stream = io.StringIO()
+        pstats.Stats(self.profile, stream=stream).sort_stats('cumulative').print_stats(self.top_n)
+        logging.info(f'Profile of {self.calls} profiled calls written to "{self.filepath}".\n{stream.getvalue()}')
+
+def log_worker_profiles(since):
+    """
+    Log a combined top-N summary of the `.prof` dumps written since a given time,
+    e.g. by the worker processes of a pool, which exit without logging their own.
+
+    Parameters:
+        since (float): Timestamp (as of `time.time()`) the dumps must be newer than.
+    """
+    filepaths = [
+        filepath for filepath in glob.glob(os.path.join(constants.Profiling.DIRPATH, '*.prof'))
+        if os.path.getmtime(filepath) >= since and not filepath.endswith(f'-{os.getpid()}.prof')
+    ]
+    if not filepaths:
+        return
+    stream = io.StringIO()
+    pstats.Stats(*filepaths, stream=stream).sort_stats('cumulative').print_stats(constants.Profiling.TOP_N)
+    logging.info(f'Combined profile of {len(filepaths)} worker processes:\n' + '\n'.join(filepaths) + f'\n{stream.getvalue()}')
+
+def profiled(function):
+    """
+    Decorator profiling every call of a function with the process's `SessionProfiler`
+    when profiling is enabled, and calling it directly otherwise.
+    """
+    @functools.wraps(function)
+    def wrapper(*args, **kwargs):
+        session = SessionProfiler.current()
+        if session is None:
+            return function(*args, **kwargs)
+        return session.call(function, *args, **kwargs)
+    return wrapper
+
 def are_instances(type_, *objs):
     """
     Check if all provided objects are instances of the given type.
@@ -89,6 +256,31 @@ def are_instances(type_, *objs):
     """
     return all(map(lambda x: isinstance(x, type_), objs))
 
+def content_key(*values):
+    """
+    Compute a short content hash of the given values, used to detect changes
+    by comparing keys instead of the values themselves.
+
+    Arrays are hashed by dtype, shape and raw bytes; any other value by its repr.
+
+    Parameters:
+        *values: Any number of np.ndarray or plain Python values
+
+    Returns:
+        str: 32-character hexadecimal digest
+    """
+    digest = hashlib.blake2b(digest_size=16)
+    for value in values:
+        if isinstance(value, np.ndarray) and value.dtype != object:
+            digest.update(f'{value.dtype}{value.shape}'.encode())
+            digest.update(np.ascontiguousarray(value).tobytes())
+        elif isinstance(value, np.ndarray):
+            digest.update(repr(value.tolist()).encode())
+        else:
+            digest.update(repr(value).encode())
+        digest.update(b'|')
+    return digest.hexdigest()
+
 def namespace_equal(ns1, ns2):
     """
     Recursively compare two argparse.Namespace objects for equality.
@@ -125,10 +317,143 @@ def namespace_equal(ns1, ns2):
             return False
     return True
 
+def _table_cache_filepath(filepath):
+    """
+    Build the cache filepath of a parsed table, keyed on the file's absolute path, size and mtime.
+
+    Parameters:
+        filepath: Path to the CSV/Excel file
+
+    Returns:
+        tuple[str, str]: The cache filepath, and a glob pattern matching every cached version of the file
+    """
+    filepath = os.path.abspath(filepath)
+    stat = os.stat(filepath)
+    path_key = content_key(filepath)
+    cache_filepath = os.path.join(constants.Cache.TABLES_DIRPATH, f'{path_key}-{stat.st_size}-{stat.st_mtime_ns}.npy')
+    pattern = os.path.join(constants.Cache.TABLES_DIRPATH, f'{path_key}-*.npy')
+    return cache_filepath, pattern
+
+def _write_table_cache(cache_filepath, pattern, table):
+    """
+    Save a parsed table to its cache file, replacing cached versions of outdated files.
+    Failures are logged and otherwise ignored, as the cache is only an optimization.
+    """
+    try:
+        os.makedirs(constants.Cache.TABLES_DIRPATH, exist_ok=True)
+        for outdated_filepath in glob.glob(pattern):
+            os.remove(outdated_filepath)
+        tmp_filepath = f'{cache_filepath}.{os.getpid()}.tmp'
+        with open(tmp_filepath, 'wb') as f:
+            np.save(f, table, allow_pickle=False)
+        os.replace(tmp_filepath, cache_filepath)
+    except Exception as e:
+        logging.warning(f'Failed to cache table at "{cache_filepath}".\nError Details: {e}')
+
+def _parse_csv(filepath):
+    """
+    Parse a numeric CSV file with NumPy, falling back to pandas for
+    irregular files (e.g. empty fields or non-numeric cells).
+    """
+    try:
+        return np.loadtxt(filepath, delimiter=',', ndmin=2)
+    except ValueError:
+        return pd.read_csv(filepath, header=None).values
+
+def read_catch_can_log(filepath, chunk_rows=constants.Logs.CHUNK_ROWS, decimals=constants.Logs.DECIMALS):
+    """
+    Stream a raw catch-can log of repeated (x, y, Pr) readings and aggregate them per position.
+
+    The file is read in chunks of `chunk_rows` rows, and the count, mean and variance
+    of each position are merged chunk by chunk (Chan et al.'s parallel update),
+    so that memory is bounded by the chunk size and the number of distinct positions.
+
+    Parameters:
+        filepath: Path to the CSV log, with x, y and Pr as its first 3 columns
+        chunk_rows: Number of rows parsed at a time
+        decimals: Positions are rounded to this many decimals before grouping
+
+    Returns:
+        Namespace: Contains
+            - Pr_table (np.ndarray): Table of [x, y, mean Pr] rows, sorted by x then y.
+            - count (np.ndarray): Number of readings per row of Pr_table.
+            - variance (np.ndarray): Population variance of the readings per row of Pr_table.
+    """
+    chunks = pd.read_csv(filepath, header=None, usecols=[0, 1, 2], chunksize=chunk_rows, dtype=float)
+    return _aggregate_readings((chunk.values for chunk in chunks), decimals)
+
+def aggregate_readings(table, decimals=constants.Logs.DECIMALS):
+    """
+    Aggregate an in-memory table of repeated (x, y, Pr) readings per position,
+    as `read_catch_can_log` does for a streamed log.
+
+    Parameters:
+        table: 2D array with x, y and Pr as its first 3 columns
+        decimals: Positions are rounded to this many decimals before grouping
+
+    Returns:
+        Namespace: See `read_catch_can_log`.
+    """
+    return _aggregate_readings([np.asarray(table, dtype=float)[:, :3]], decimals)
+
+def has_repeated_positions(table, decimals=constants.Logs.DECIMALS):
+    """
+    Whether a numeric (x, y, Pr) table holds several readings of some position.
+    """
+    positions = np.asarray(table, dtype=float)[:, :2]
+    positions = positions[~np.isnan(positions).any(axis=1)].round(decimals)
+    return np.unique(positions, axis=0).shape[0] < positions.shape[0]
+
+def _aggregate_readings(chunks, decimals):
+    """
+    Merge the count, mean and variance of the readings of each position, chunk by chunk.
+    """
+    positions = np.empty((0, 2))
+    count = np.empty(0)
+    mean = np.empty(0)
+    M2 = np.empty(0)
+    for chunk in chunks:
+        chunk = chunk[~np.isnan(chunk).any(axis=1)]
+        chunk_positions, inverse = np.unique(chunk[:, :2].round(decimals), axis=0, return_inverse=True)
+        inverse = inverse.ravel()
+        chunk_count = np.bincount(inverse).astype(float)
+        chunk_mean = np.bincount(inverse, chunk[:, 2]) / chunk_count
+        chunk_M2 = np.bincount(inverse, (chunk[:, 2] - chunk_mean[inverse]) ** 2)
+        
+        positions, merged_inverse = np.unique(np.concatenate([positions, chunk_positions]), axis=0, return_inverse=True)
+        merged_inverse = merged_inverse.ravel()
+        old_inverse, new_inverse = merged_inverse[:count.size], merged_inverse[count.size:]
+        merged_count = np.zeros(len(positions))
+        merged_mean = np.zeros(len(positions))
+        merged_M2 = np.zeros(len(positions))
+        merged_count[old_inverse] = count
+        merged_mean[old_inverse] = mean
+        merged_M2[old_inverse] = M2
+        
+        n_a, n_b = merged_count[new_inverse], chunk_count
+        n = n_a + n_b
+        delta = chunk_mean - merged_mean[new_inverse]
+        merged_mean[new_inverse] += delta * n_b / n
+        merged_M2[new_inverse] += chunk_M2 + delta ** 2 * n_a * n_b / n
+        merged_count[new_inverse] = n
+        count, mean, M2 = merged_count, merged_mean, merged_M2
+    
+    return Namespace(
+        Pr_table = np.column_stack([positions, mean]),
+        count    = count.astype(int),
+        variance = M2 / np.maximum(count, 1),
+    )
+
 def read_csv(filepath):
     """
     Read a CSV/Excel file into a numpy array.
 
+    Numeric tables are cached as .npy files keyed on the file's path, size and mtime,
+    so that re-reading an unchanged file skips parsing. Raw catch-can logs, holding
+    repeated readings of some positions, are aggregated to the mean Pr per position:
+    CSV files larger than `constants.Logs.STREAMING_BYTES` are streamed through
+    `read_catch_can_log`, smaller files go through `aggregate_readings` once parsed.
+
     Parameters:
         filepath: Path to the CSV file
 
@@ -138,26 +463,126 @@ def read_csv(filepath):
     ext = os.path.splitext(filepath)[-1].lower().strip()
     assert ext in {'.csv', '.xls', '.xlsx'}, 'You must either provide a CSV-file or an Excel-sheet'
     try:
-        if ext == '.csv':
-            table = pd.read_csv(filepath, header=None)
+        cache_filepath, pattern = _table_cache_filepath(filepath)
+        if os.path.isfile(cache_filepath):
+            try:
+                return np.load(cache_filepath, allow_pickle=False)
+            except Exception as e:
+                logging.warning(f'Failed to load cached table from "{cache_filepath}".\nError Details: {e}')
+        if ext == '.csv' and os.path.getsize(filepath) > constants.Logs.STREAMING_BYTES:
+            table = read_catch_can_log(filepath).Pr_table
+        elif ext == '.csv':
+            table = _parse_csv(filepath)
         else:
-            table = pd.read_excel(filepath, header=None)
-        table = table.values
+            table = pd.read_excel(filepath, header=None).values
+        if table.dtype != object and table.shape[1] >= 3 and has_repeated_positions(table):
+            table = aggregate_readings(table).Pr_table
+        if table.dtype != object:
+            _write_table_cache(cache_filepath, pattern, table)
         return table
     except Exception as e:
         logging.error(f'Failed to load CSV file from "{filepath}.\nError Details: {e}"')
         return None
 
-def write_csv(filepath:str, table:np.array):
+def iter_row_chunks(array, chunk_values=constants.Exports.CHUNK_VALUES):
+    """
+    Iterate over a 2D array in chunks of whole rows holding about `chunk_values` values,
+    so that large (e.g. memory-mapped) arrays are processed with bounded memory.
+
+    Parameters:
+        array: 2D numpy array
+        chunk_values: Approximate number of values per chunk
+
+    Yields:
+        tuple[slice, np.ndarray]: The rows' slice and the corresponding chunk
+    """
+    chunk_rows = max(1, chunk_values // max(1, array.shape[1]))
+    for start in range(0, array.shape[0], chunk_rows):
+        rows = slice(start, start + chunk_rows)
+        yield rows, np.asarray(array[rows])
+
+def write_csv(filepath:str, table:np.array, fmt:str=constants.Exports.CSV_FORMAT):
     """
     Save a numpy array to a CSV/Excel file.
 
+    CSV values are written with the fixed `fmt` format, one formatting call per
+    chunk of rows rather than per row.
+
     Parameters:
         filepath: Path to save the CSV file
         table: 2D numpy array to save
+        fmt: printf-style format of each CSV value
     """
     ext = os.path.splitext(filepath)[-1].lower().strip()
     assert ext in {'.csv', '.xls', '.xlsx'}, 'You must either provide a CSV-file or an Excel-sheet'
+    if ext != '.csv':
+        return pd.DataFrame(table).to_excel(filepath, header=False, index=False)
+    table = np.asarray(table) if table.ndim == 2 else np.asarray(table).reshape(len(table), -1)
+    row_fmt = ','.join([fmt] * table.shape[1]) + '\n'
+    with open(filepath, 'w') as f:
+        for _, chunk in iter_row_chunks(table):
+            f.write((row_fmt * len(chunk)) % tuple(chunk.ravel().tolist()))
+
+def write_raster(filepath:str, image:np.ndarray, resolution:int):
+    """
+    Save a 2D Pr image (e.g. an evaluated zone) as a compact raster file.
+
+    Supported formats:
+        - .png / .tif / .tiff: 16-bit grayscale, where Pr = offset + scale * pixel value;
+          offset, scale and resolution are stored as JSON in the file's metadata
+          (PNG text chunk or TIFF image description).
+        - .npz: compressed float64 array, along with its resolution.
+        - .csv: fixed-precision text, see `write_csv`.
+
+    Parameters:
+        filepath: Path to save the raster file
+        image: 2D numpy array of Pr values, possibly memory-mapped
+        resolution: Pixels per meter of the image
+    """
+    ext = os.path.splitext(filepath)[-1].lower().strip()
+    assert ext in {'.png', '.tif', '.tiff', '.npz', '.csv'}, 'You must either provide a PNG, TIFF, NPZ or CSV file'
     if ext == '.csv':
-        return np.savetxt(filepath, table, delimiter=',')
-    return pd.DataFrame(table).to_excel(filepath)
\ No newline at end of file
+        return write_csv(filepath, image)
+    if ext == '.npz':
+        return np.savez_compressed(filepath, image=image, resolution=resolution)
+    
+    offset, maximum = np.inf, -np.inf
+    for _, chunk in iter_row_chunks(image):
+        offset, maximum = min(offset, chunk.min()), max(maximum, chunk.max())
+    scale = (maximum - offset) / np.iinfo(np.uint16).max or 1.0
+    pixels = np.empty(image.shape, dtype=np.uint16)
+    for rows, chunk in iter_row_chunks(image):
+        pixels[rows] = np.rint((chunk - offset) / scale)
+    
+    metadata = json.dumps(dict(offset=float(offset), scale=float(scale), resolution=resolution, units='mm/hr'))
+    raster = Image.fromarray(pixels)
+    if ext == '.png':
+        info = PngImagePlugin.PngInfo()
+        info.add_text('sprinklers', metadata)
+        raster.save(filepath, pnginfo=info)
+    else:
+        raster.save(filepath, description=metadata, compression='tiff_deflate')
+
+def read_raster(filepath:str):
+    """
+    Read a raster file written by `write_raster` back into Pr values.
+
+    Parameters:
+        filepath: Path to the PNG, TIFF or NPZ raster file
+
+    Returns:
+        tuple[np.ndarray, int]: The 2D Pr image and its resolution in pixels per meter
+    """
+    ext = os.path.splitext(filepath)[-1].lower().strip()
+    assert ext in {'.png', '.tif', '.tiff', '.npz'}, 'You must either provide a PNG, TIFF or NPZ file'
+    if ext == '.npz':
+        with np.load(filepath) as archive:
+            return archive['image'], archive['resolution'].item()
+    with Image.open(filepath) as raster:
+        if ext == '.png':
+            metadata = raster.text['sprinklers']
+        else:
+            metadata = raster.tag_v2[270]
+        pixels = np.asarray(raster, dtype=np.float64)
+    metadata = json.loads(metadata)
+    return metadata['offset'] + metadata['scale'] * pixels, metadata['resolution']
\ No newline at end of file
@@ -21,18 +21,25 @@ along with this program. If not, see <https://www.gnu.org/licenses/>.
 from PyQt5.QtWidgets import (
     QWidget, QVBoxLayout, QLabel, QTableWidget, QComboBox, QTableWidgetItem,
     QPushButton, QSlider, QStyledItemDelegate, QHBoxLayout, QGroupBox,
-    QFormLayout, QTextEdit, QLineEdit, QFileDialog, QTabWidget, 
+    QFormLayout, QTextEdit, QLineEdit, QFileDialog, QTabWidget, QStackedWidget,
 )
 from PyQt5.QtGui import QColor, QBrush, QDoubleValidator
 from PyQt5.QtCore import Qt, QTimer
+from collections import OrderedDict
 import numpy as np
+import time
 import os
 
 from viewmodel import ViewModel
-from utils import INIParser
-from sprinklers import evaluate
-from utils import write_csv
-from widgets import DoubleSpinBox, SimpleHeader, RotatedHeader, Canvas4ImageAs3D
+from utils import INIParser, AdaptiveDelay, profiled, content_key
+from sprinklers import evaluate, fit_resolution, converge_resolution, build_integral_images, query_region, compute_CU, compute_sensitivity, evaluate_uncertainty
+from utils import write_csv, write_raster
+from snapshots import export_snapshots, orbit_angles, create_executor
+from project import save_project, load_project
+from service import evaluate_remote
+from store import ResultsStore
+import logging
+from widgets import DoubleSpinBox, SimpleHeader, RotatedHeader, Canvas4ImageAs3D, Canvas4ImageAs2D
 import constants
 
 class NumericDelegate(QStyledItemDelegate):
@@ -73,16 +80,36 @@ class View(QWidget):
         - config_parser: The INIParser instance for reading/writing configuration
     
         Responsibilities:
-        1. Store references to the viewmodel and config parser for later use.
-        2. Initialize internal flags, e.g., `zero_input_flag`.
+        1. Store references to the viewmodel and config parser for later use,
+           the optional evaluation service URL (`[Service] URL` in config.ini) and
+           the optional SQLite results store (`[Store] FILEPATH` in config.ini)
+           the debug flag (`[General] DEBUG` in config.ini), which profiles each evaluation
+           and overlays render statistics on the 3D canvases,
+           the memory budget of evaluations (`[Evaluation] MEMORY_BUDGET_MB` and `DOWNSCALE`),
+           and the relative error of the catch-can readings (`[Evaluation] UNCERTAINTY`, 0 to
+           skip the uncertainty bands of the metrics).
+        2. Initialize internal flags, e.g., `zero_input_flag` and `stale_plot_modes`,
+           the cached catch-can sensitivity of the current result, the cached uncertainty
+           bands of recent inputs, and the snapshot worker pool, created on the first export.
         3. Set up the user interface by calling `init_ui()`.
         4. Connect UI elements to the ViewModel via `bind_viewmodel()`.
         """
         super().__init__()
         self.zero_input_flag = False
+        self.stale_plot_modes = set()
+        self.sensitivity = None
+        self.snapshots_executor = None
+        self.uncertainty_cache = OrderedDict()
         
         self.viewmodel    = viewmodel
         self.config_parser = config_parser
+        self.service_url  = config_parser.clean_inline_get('Service', 'URL') if config_parser.has_option('Service', 'URL') else ''
+        store_filepath    = config_parser.clean_inline_get('Store', 'FILEPATH') if config_parser.has_option('Store', 'FILEPATH') else ''
+        self.results_store = ResultsStore(store_filepath) if store_filepath else None
+        self.debug        = config_parser.getboolean('General', 'DEBUG') if config_parser.has_option('General', 'DEBUG') else False
+        self.memory_budget_mb = config_parser.getint('Evaluation', 'MEMORY_BUDGET_MB') if config_parser.has_option('Evaluation', 'MEMORY_BUDGET_MB') else constants.Evaluation.MEMORY_BUDGET_MB
+        self.downscale    = config_parser.getboolean('Evaluation', 'DOWNSCALE') if config_parser.has_option('Evaluation', 'DOWNSCALE') else True
+        self.uncertainty  = config_parser.getfloat('Evaluation', 'UNCERTAINTY') if config_parser.has_option('Evaluation', 'UNCERTAINTY') else 0.0
         
         self.init_ui()
         self.bind_viewmodel()
@@ -97,6 +124,13 @@ class View(QWidget):
         self.evaluation_timer = QTimer(self)
         self.evaluation_timer.setSingleShot(True)
         self.evaluation_timer.timeout.connect(self.update_evaluation_result)
+        self.evaluation_delay = AdaptiveDelay(
+            constants.Evaluation.DELAY_MS,
+            constants.Evaluation.MIN_DELAY_MS,
+            constants.Evaluation.MAX_DELAY_MS,
+            constants.Evaluation.DELAY_FACTOR,
+            constants.Evaluation.TIMINGS_HISTORY,
+        )
         
         self.main_layout = QHBoxLayout(self)
         self.setLayout(self.main_layout)
@@ -135,6 +169,13 @@ class View(QWidget):
         self.export_config_button = QPushButton('📑 Save Config')
         self.parameters_panel.addWidget(self.export_config_button)
         
+        project_layout = QHBoxLayout()
+        self.save_project_button = QPushButton('💾 Save Project')
+        self.open_project_button = QPushButton('📂 Open Project')
+        project_layout.addWidget(self.save_project_button)
+        project_layout.addWidget(self.open_project_button)
+        self.parameters_panel.addLayout(project_layout)
+        
         self.parameters_panel.addSpacing(9)
         
         self.config_tab_widget.addTab(self.parameters_tab, "Parameters")
@@ -171,6 +212,9 @@ class View(QWidget):
         homogenous_layout.addWidget(self.homogenous_groupbox_canvas)
         self.plot_tab_widget.addTab(self.homogenous_tab, "Homogeneous Plot")
         
+        self.export_zone_button = QPushButton('🗺️ Export Zone')
+        self.plot_panel.addWidget(self.export_zone_button)
+        
         # ---------------------------
         # RIGHT METRICS PANEL
         # ---------------------------
@@ -194,7 +238,11 @@ class View(QWidget):
         self.csv_browse_button.setObjectName('csv_browse_button')
         self.snapshots_browse_button.setObjectName('snapshots_browse_button')
         self.export_csv_button.setObjectName('export_csv_button')
+        self.export_zone_button.setObjectName('export_zone_button')
         self.export_config_button.setObjectName('export_config_button')
+        self.save_project_button.setObjectName('save_project_button')
+        self.open_project_button.setObjectName('open_project_button')
+        self.auto_resolution_button.setObjectName('auto_resolution_button')
         self.metrics_label.setObjectName('metrics_label')
         self.setStyleSheet(constants.Themes.LIGHT)
 
@@ -206,6 +254,9 @@ class View(QWidget):
         Components:
         - QLabel showing the current resolution.
         - QSlider allowing the user to adjust the resolution from 5 to 100.
+        - Auto resolution row: tolerance spinbox (± CU/DU percentage points) and 'Auto' button,
+          with a label stating the accuracy of the selected resolution.
+        - Plot mode dropdown: '3D Surface' or '2D Heatmap'
     
         Returns:
             QGroupBox: The assembled 'General' groupbox ready to be added to a layout.
@@ -219,6 +270,25 @@ class View(QWidget):
     
         layout.addWidget(self.resolution_label)
         layout.addWidget(self.resolution_slider)
+        
+        auto_layout = QHBoxLayout()
+        auto_layout.addWidget(QLabel('Tolerance (±%):'))
+        self.auto_tolerance_spinbox = DoubleSpinBox(0.01, 5.0, single_step=0.05)
+        self.auto_tolerance_spinbox.setValue(constants.Evaluation.AUTO_TOLERANCE)
+        auto_layout.addWidget(self.auto_tolerance_spinbox, stretch=1)
+        self.auto_resolution_button = QPushButton('🎯 Auto')
+        auto_layout.addWidget(self.auto_resolution_button)
+        layout.addLayout(auto_layout)
+        self.auto_resolution_label = QLabel('')
+        self.auto_resolution_label.setWordWrap(True)
+        layout.addWidget(self.auto_resolution_label)
+        
+        selector_layout = QHBoxLayout()
+        selector_layout.addWidget(QLabel('Plot mode:'))
+        self.plot_mode_dropdown = QComboBox()
+        self.plot_mode_dropdown.addItems(['3D Surface', '2D Heatmap'])
+        selector_layout.addWidget(self.plot_mode_dropdown, stretch=1)
+        layout.addLayout(selector_layout)
         return groupbox
     
     
@@ -332,9 +402,12 @@ class View(QWidget):
         form = QFormLayout()
         self.Pr_step_spinbox = DoubleSpinBox(0.1, 20.0)
         form.addRow('Step (m):', self.Pr_step_spinbox)
+        self.table_colors_dropdown = QComboBox()
+        self.table_colors_dropdown.addItems(['Pr', 'CU influence', 'DU influence'])
+        form.addRow('Colors:', self.table_colors_dropdown)
         sub_layout.addLayout(form)
         
-        sub_layout.addSpacing(46)
+        sub_layout.addSpacing(12)
         
         self.table = QTableWidget()
         self.table.setAlternatingRowColors(True)
@@ -365,19 +438,34 @@ class View(QWidget):
         
         Notes:
             - Centers the groupbox title.
-            - Instantiates a Canvas4ImageAs3D widget and stores a reference
-              to it in the corresponding instance attribute:
-              `self.zone_canvas` or `self.homogenous_plot_canvas`.
+            - Instantiates a Canvas4ImageAs3D and a Canvas4ImageAs2D widget in a
+              QStackedWidget (one page per plot mode) and stores references to them
+              in the corresponding instance attributes: `self.zone_canvas` and
+              `self.zone_heatmap_canvas`, or `self.homogenous_plot_canvas` and
+              `self.homogenous_plot_heatmap_canvas`.
+            - The zone groupbox also holds `self.region_label`, showing the statistics
+              of the region selected on the zone heatmap (heatmap mode only).
         """
         groupbox = QGroupBox(title)
         groupbox.setAlignment(Qt.AlignHCenter)
         layout = QVBoxLayout(groupbox)
-        canvas = Canvas4ImageAs3D(self)
-        layout.addWidget(canvas)
+        stack = QStackedWidget()
+        canvas = Canvas4ImageAs3D(self, show_render_stats=self.debug)
+        heatmap_canvas = Canvas4ImageAs2D(self)
+        stack.addWidget(canvas)
+        stack.addWidget(heatmap_canvas)
+        layout.addWidget(stack)
         if title.lower() == 'zone':
             self.zone_canvas = canvas
+            self.zone_heatmap_canvas = heatmap_canvas
+            self.zone_canvas_stack = stack
+            self.region_label = QLabel('Drag on the heatmap to select a region.')
+            self.region_label.setVisible(False)
+            layout.addWidget(self.region_label)
         else:
             self.homogenous_plot_canvas = canvas
+            self.homogenous_plot_heatmap_canvas = heatmap_canvas
+            self.homogenous_plot_canvas_stack = stack
         groupbox.setMinimumHeight(433)
         return groupbox
     
@@ -429,6 +517,7 @@ class View(QWidget):
         self._bind_Pr_step()
         self._bind_Pr_table()
         self._bind_exports()
+        self._bind_plot_mode()
         
         
     def _bind_resolution(self):
@@ -440,10 +529,11 @@ class View(QWidget):
             lambda value: (
                 self.resolution_slider.setValue(value),
                 self.resolution_label.setText(f'Resolution: {value}'),
-                self.evaluation_timer.start(constants.Evaluation.DELAY_MS)
+                self.schedule_evaluation()
             )
         )
         self.viewmodel.resolution__changed.emit(self.viewmodel.resolution)
+        self.auto_resolution_button.clicked.connect(self.select_auto_resolution)
     
     
     def _bind_zone_dimensions(self):
@@ -456,7 +546,7 @@ class View(QWidget):
             lambda value: (
                 self.zone_dim_a_spinbox.setValue(value[0]),
                 self.zone_dim_b_spinbox.setValue(value[1]),
-                self.evaluation_timer.start(constants.Evaluation.DELAY_MS)
+                self.schedule_evaluation()
             )
         )
         self.viewmodel.zone_dim_meters__changed.emit(self.viewmodel.zone_dim_meters)
@@ -480,8 +570,16 @@ class View(QWidget):
         """
         Update the sprinkler configuration UI based on the ViewModel's config_meters.
         Handles both Triangle (single value) and Rectangle (two values) configurations.
+        
+        Widget signals are blocked meanwhile, so that partially updated widgets
+        are not written back to the ViewModel.
         """
+        widgets = (self.config_dropdown, self.config_dim_a_spinbox, self.config_dim_b_spinbox)
+        for widget in widgets:
+            widget.blockSignals(True)
+        
         self.config_dropdown.setCurrentIndex(0 if self.viewmodel.is_triangle else 1)
+        self.config_dim_a_label.setText('Side (m):' if self.viewmodel.is_triangle else 'Width (m):')
     
         self.config_dim_b_label.setVisible(not self.viewmodel.is_triangle)
         self.config_dim_b_spinbox.setVisible(not self.viewmodel.is_triangle)
@@ -493,6 +591,8 @@ class View(QWidget):
             a = self.viewmodel.config_meters[0]
         finally:
             self.config_dim_a_spinbox.setValue(a)
+            for widget in widgets:
+                widget.blockSignals(False)
     
     
     def on_config_changed(self):
@@ -518,7 +618,7 @@ class View(QWidget):
         b = self.config_dim_b_spinbox.value()
         value = (a, b) if self.config_dim_b_spinbox.isVisible() else (a,)
         self.viewmodel.set__config_meters(value)
-        self.evaluation_timer.start(constants.Evaluation.DELAY_MS)
+        self.schedule_evaluation()
     
     
     def _bind_csv_path(self):
@@ -529,7 +629,7 @@ class View(QWidget):
         self.viewmodel.csv_filepath__changed.connect(
             lambda value: (
                 self.csv_path_edit.setText(value),
-                self.evaluation_timer.start(constants.Evaluation.DELAY_MS),
+                self.schedule_evaluation(),
             )
         )
         self.viewmodel.csv_filepath__changed.emit(self.viewmodel.csv_filepath)
@@ -555,7 +655,7 @@ class View(QWidget):
             lambda value: (
                 self.Pr_step_spinbox.setValue(value),
                 self.update_header_labels(),
-                self.evaluation_timer.start(constants.Evaluation.DELAY_MS)
+                self.schedule_evaluation()
             )
         )
         self.viewmodel.Pr_step__changed.emit(self.viewmodel.Pr_step)
@@ -565,9 +665,11 @@ class View(QWidget):
         """
         Bind table updates to the ViewModel.
         """
-        self.table.itemChanged.connect(self.update_Pr_grid)
+        self.table.itemChanged.connect(lambda item: self.update_Pr_grid())
         self.viewmodel.Pr_grid__changed.connect(self.update_table)
         self.update_table(self.viewmodel.Pr_grid)
+        self.table_colors_dropdown.currentIndexChanged.connect(lambda index: self.update_table_colors())
+        self.viewmodel.evaluation_result__changed.connect(lambda result: self.update_table_colors())
         
         
     def _bind_exports(self):
@@ -576,8 +678,32 @@ class View(QWidget):
         """
         self.export_csv_button.clicked.connect(self.on_export_csv_button_clicked)
         self.export_config_button.clicked.connect(self.export_config)
+        self.save_project_button.clicked.connect(self.select_project_file_to_save)
+        self.open_project_button.clicked.connect(self.select_project_file_to_open)
+        self.export_zone_button.clicked.connect(self.select_zone_file_to_export)
         
         
+    def _bind_plot_mode(self):
+        """
+        Bind the plot mode dropdown to the canvas stacks.
+        """
+        self.plot_mode_dropdown.currentIndexChanged.connect(self.on_plot_mode_changed)
+        self.zone_heatmap_canvas.region_selected.connect(self.update_region_statistics)
+        
+        
+    def on_plot_mode_changed(self, index):
+        """
+        Switch both canvas stacks to the selected plot mode (0: 3D surface, 1: 2D heatmap),
+        replotting the current evaluation result only if that mode is out of date.
+        """
+        self.zone_canvas_stack.setCurrentIndex(index)
+        self.homogenous_plot_canvas_stack.setCurrentIndex(index)
+        self.region_label.setVisible(index == 1)
+        result = self.viewmodel.evaluation_result
+        if index in self.stale_plot_modes and result is not None:
+            self.update_plots(result)
+            
+            
     def on_zone_dims_changed(self):
         """
         Update the ViewModel with the current zone dimensions from the spinboxes
@@ -587,7 +713,7 @@ class View(QWidget):
         h = self.zone_dim_b_spinbox.value()
         value = (w, h)
         self.viewmodel.set__zone_dim_meters(value)
-        self.evaluation_timer.start(constants.Evaluation.DELAY_MS)
+        self.schedule_evaluation()
         
     @staticmethod
     def blues_qcolor(normalized_value: float) -> QColor:
@@ -621,6 +747,15 @@ class View(QWidget):
         return item
         
     
+    @staticmethod
+    def influence_qcolor(normalized_value: float) -> QColor:
+        v = max(-1.0, min(1.0, normalized_value))
+        hue = 220 if v >= 0 else 0   # blue raises the metric, red lowers it
+        sat = int(255 * abs(v))      # 0 → white
+        return QColor.fromHsv(hue, sat, 255)
+    
+    
+    @profiled
     def update_table(self, arr):
         """
         Update the QTableWidget with new Pr values and refresh cell formatting.
@@ -665,12 +800,59 @@ class View(QWidget):
         self.Pr_table_groupbox.setFixedWidth(parameter_panel_width)
         self.Pr_measurements_groupbox.setFixedWidth(parameter_panel_width)
         self.export_config_button.setFixedWidth(parameter_panel_width)
+        self.save_project_button.setFixedWidth((parameter_panel_width - 6) // 2)
+        self.open_project_button.setFixedWidth((parameter_panel_width - 6) // 2)
         self.export_csv_button.setFixedWidth(parameter_panel_width)
         self.config_tab_widget.setFixedWidth(parameter_panel_width + 22)
         
         self.table.blockSignals(False)
 
 
+    def update_table_colors(self):
+        """
+        Color the Pr table by the selected quantity: the Pr values themselves, or the
+        influence of each catch-can on the CU or DU of the current evaluation result,
+        i.e. d(metric)/d(Pr) from `compute_sensitivity`, normalized by its largest magnitude.
+        The sensitivity is computed once per result, on demand.
+        """
+        mode = self.table_colors_dropdown.currentIndex()
+        if mode == 0:
+            self.update_table(self.viewmodel.Pr_grid)
+            return
+        result = self.viewmodel.evaluation_result
+        if result is None:
+            return
+        if self.sensitivity is None or self.sensitivity[0] is not result:
+            try:
+                sensitivity = compute_sensitivity(
+                    self.viewmodel.resolution,
+                    self.viewmodel.zone_dim_meters,
+                    self.viewmodel.config_meters,
+                    self.viewmodel.Pr_table,
+                    result,
+                )
+            except Exception as e:
+                logging.error(f'Failed to compute the catch-can sensitivity.\nError Details: {e}')
+                return
+            self.sensitivity = (result, sensitivity)
+        metric = ('CU', 'DU')[mode - 1]
+        gradient = getattr(self.sensitivity[1], metric)
+        rows, cols = gradient.shape
+        if (rows + 1, cols + 1) != (self.table.rowCount(), self.table.columnCount()):
+            return
+        
+        self.table.blockSignals(True)
+        scale = np.nanmax(np.abs(gradient)) + 1e-12
+        for i in range(rows):
+            for j in range(cols):
+                item = self.table.item(i, j)
+                normalized_value = gradient[i, j] / scale
+                item.setBackground(QBrush(self.influence_qcolor(normalized_value)))
+                item.setForeground(QBrush(QColor(255, 255, 255) if abs(normalized_value) > 0.5 else QColor(17, 17, 17)))
+                item.setToolTip(f'd({metric})/d(Pr) = {gradient[i, j]:+.4f} % per unit of Pr')
+        self.table.blockSignals(False)
+        
+        
     def update_header_labels(self):
         """
         Update the vertical and horizontal headers of the Pr table
@@ -713,6 +895,63 @@ class View(QWidget):
             self.csv_path_edit.setText(filepath)
             
             
+    def _create_project_file_dialog(self, title, accept_mode):
+        """
+        Create a Qt file dialog filtered on project files (*.npz).
+        """
+        dialog = QFileDialog(self, caption=title)
+        dialog.setNameFilter('Project Files (*.npz)')
+        dialog.setDefaultSuffix('npz')
+        dialog.setAcceptMode(accept_mode)
+        dialog.setOption(QFileDialog.DontUseNativeDialog, True)  # Force Qt dialog
+        for button in dialog.findChildren(QPushButton):
+            button.setStyleSheet('color: black')
+        return dialog
+        
+        
+    def select_project_file_to_save(self):
+        """
+        Open a file dialog for the user to choose where to save the current project.
+        """
+        dialog = self._create_project_file_dialog('Save Project', QFileDialog.AcceptSave)
+        if dialog.exec() == QFileDialog.Accepted:
+            self.save_project(dialog.selectedFiles()[0])
+            
+            
+    def select_project_file_to_open(self):
+        """
+        Open a file dialog for the user to choose a project to open.
+        """
+        dialog = self._create_project_file_dialog('Open Project', QFileDialog.AcceptOpen)
+        dialog.setFileMode(QFileDialog.ExistingFile)
+        if dialog.exec() == QFileDialog.Accepted:
+            self.open_project(dialog.selectedFiles()[0])
+            
+            
+    def select_zone_file_to_export(self):
+        """
+        Open a file dialog for the user to choose where and in which format
+        to export the evaluated zone, then export it.
+        """
+        result = self.viewmodel.evaluation_result
+        if result is None:
+            return
+        dialog = QFileDialog(self, caption='Export Zone')
+        dialog.setNameFilters([
+            '16-bit PNG (*.png)', '16-bit TIFF (*.tif *.tiff)',
+            'Compressed NumPy (*.npz)', 'CSV Files (*.csv)',
+        ])
+        dialog.setAcceptMode(QFileDialog.AcceptSave)
+        dialog.setOption(QFileDialog.DontUseNativeDialog, True)  # Force Qt dialog
+        for button in dialog.findChildren(QPushButton):
+            button.setStyleSheet('color: black')
+        if dialog.exec() == QFileDialog.Accepted:
+            filepath = dialog.selectedFiles()[0]
+            if not os.path.splitext(filepath)[-1]:
+                filepath += dialog.selectedNameFilter().split('*')[1].split(' ')[0].rstrip(')')
+            write_raster(filepath, result.zone, self.viewmodel.resolution)
+            
+            
     def select_snapshots_directory(self):
         """
         Open a file dialog for the user to select a snapshot saving directory.
@@ -734,7 +973,9 @@ class View(QWidget):
     def keyPressEvent(self, event):
         """
         Handles key presses to allow setting selected table items to zero
-        when the '0' key is pressed.
+        when the '0' key is pressed, exporting snapshots with Ctrl+S
+        (Ctrl+Shift+S for a full orbit), rotating the plots with WASD and
+        toggling their render statistics overlay with F.
         """
         text = event.text()
         self.zero_input_flag = text == '0'
@@ -747,19 +988,53 @@ class View(QWidget):
             self.update_Pr_grid()
             self.zero_input_flag = False
         elif (event.modifiers() & Qt.ControlModifier) and event.key() == Qt.Key_S:
-            csv_filename = os.path.basename(self.viewmodel.csv_filepath)
-            tablename = os.path.splitext(csv_filename)[0]
-            str_elev = 'elev_' + ('' if self.zone_canvas.ax.elev > 0 else '(') + str(abs(self.zone_canvas.ax.elev)) + ('' if self.zone_canvas.ax.elev > 0 else ')')
-            str_azim = 'azim_' + ('' if self.zone_canvas.ax.azim > 0 else '(') + str(abs(self.zone_canvas.ax.azim)) + ('' if self.zone_canvas.ax.azim > 0 else ')')
-            snapshots_dirpath = self.snapshots_path_edit.text()
-            png_filepath_stem = os.path.join(snapshots_dirpath, f'{tablename}__{str_elev}__{str_azim}')
-            self.zone_canvas.export_png(f'{png_filepath_stem}__zone.png')
-            self.homogenous_plot_canvas.export_png(f'{png_filepath_stem}__plot.png')
-        elif text in 'adADwsWS':
+            self.export_snapshots(orbit=bool(event.modifiers() & Qt.ShiftModifier))
+        elif text and text in 'adADwsWSfF':
             self.zone_canvas.keyPressEvent(event)
             self.homogenous_plot_canvas.keyPressEvent(event)
             
         
+    def export_snapshots(self, orbit=False):
+        """
+        Export PNG snapshots of the zone and homogeneous plots in background worker processes.
+        
+        Parameters:
+            orbit (bool): If True, export a turntable of `constants.Snapshots.ORBIT_FRAMES`
+                          azimuths at the current elevation, otherwise only the current view.
+        """
+        result = self.viewmodel.evaluation_result
+        if result is None:
+            return
+        csv_filename = os.path.basename(self.viewmodel.csv_filepath)
+        tablename = os.path.splitext(csv_filename)[0]
+        elev, azim = self.zone_canvas.ax.elev, self.zone_canvas.ax.azim
+        if orbit:
+            angles = orbit_angles(elev, azim, constants.Snapshots.ORBIT_FRAMES)
+        else:
+            angles = [(elev, azim)]
+        if self.snapshots_executor is None:
+            self.snapshots_executor = create_executor()
+        export_snapshots(
+            {'zone': result.zone, 'plot': result.homogenous_plot},
+            self.viewmodel.resolution,
+            angles,
+            self.snapshots_path_edit.text(),
+            tablename,
+            executor = self.snapshots_executor,
+        )
+        
+        
+    def closeEvent(self, event):
+        """
+        Shut the snapshot worker pool down on close, once its pending snapshots are saved.
+        """
+        if self.snapshots_executor is not None:
+            self.snapshots_executor.shutdown(wait=True)
+            self.snapshots_executor = None
+        super().closeEvent(event)
+        
+        
+    @profiled
     def update_Pr_grid(self):
         """
         Reads values from the QTableWidget, constructs the Pr grid,
@@ -798,36 +1073,362 @@ class View(QWidget):
             arr = np.zeros((2,2))
         self.viewmodel.set__Pr_grid(arr)
         self.update_table(arr)
-        self.evaluation_timer.start(constants.Evaluation.DELAY_MS)
+        self.schedule_evaluation()
         
         
+    def select_auto_resolution(self):
+        """
+        Set the resolution to the lowest one whose CU and DU are within the selected
+        tolerance of their values extrapolated to infinite resolution (see
+        `sprinklers.converge_resolution`), and state the achieved accuracy.
+        """
+        tolerance = self.auto_tolerance_spinbox.value()
+        try:
+            selection = converge_resolution(
+                self.viewmodel.zone_dim_meters,
+                self.viewmodel.config_meters,
+                self.viewmodel.Pr_table,
+                tolerance,
+                self.resolution_slider.minimum(),
+                self.resolution_slider.maximum(),
+                constants.Evaluation.AUTO_FACTOR,
+            )
+        except Exception as e:
+            logging.error(f'Failed to select the resolution automatically.\nError Details: {e}')
+            return
+        if selection.converged:
+            self.auto_resolution_label.setText(
+                f'Resolution {selection.resolution}: CU/DU within ±{selection.error:.2f} % of the extrapolated limit.'
+            )
+        else:
+            self.auto_resolution_label.setText(
+                f'Not converged to ±{tolerance:.2f} % up to resolution {selection.resolution} '
+                f'(CU/DU within ±{selection.error:.2f} %).'
+            )
+        self.viewmodel.set__resolution(selection.resolution)
+        
+        
+    def schedule_evaluation(self):
+        """
+        (Re)start the evaluation timer with the current adaptive debounce delay.
+        """
+        self.evaluation_timer.start(self.evaluation_delay.delay_ms)
+        
+        
+    @profiled
     def update_evaluation_result(self):
         """
         Evaluates the current sprinkler configuration and updates
         the ViewModel, metrics display, and plots.
+        
+        The wall times of the evaluation and the plotting are recorded
+        to adapt the debounce delay of subsequent evaluations. Zones of at least
+        `constants.Evaluation.MEMMAP_MIN_BYTES` are backed by a scratch file.
+        If an evaluation service URL is configured, the evaluation is delegated
+        to it, falling back to a local evaluation if the service fails.
+        If a results store is configured, the metrics are recorded in it.
+        In debug mode, local evaluations are profiled stage by stage.
+        
+        Before anything is allocated, the peak memory of the evaluation is estimated
+        and compared to the memory budget: over budget, the resolution is lowered
+        to the highest one that fits (with a notice), or if downscaling is disabled
+        or nothing fits, the evaluation is refused.
+        
+        If the catch-can readings have a relative error configured, the uncertainty
+        bands of the interior repeat cell's metrics are estimated too, as part of the
+        evaluation's cost (see `evaluate_uncertainty_bands()`).
         """
-        result = evaluate(
-            self.viewmodel.resolution, 
+        zone_dirpath = self._zone_dirpath(self.viewmodel.resolution)
+        
+        budget_bytes = self.memory_budget_mb * 1024 ** 2
+        resolution = fit_resolution(
+            self.viewmodel.resolution,
             self.viewmodel.zone_dim_meters,
             self.viewmodel.config_meters,
-            self.viewmodel.Pr_table
+            self.viewmodel.Pr_table,
+            budget_bytes,
+            zone_dirpath,
         )
+        notice = None
+        if resolution != self.viewmodel.resolution:
+            if resolution is None or resolution < self.resolution_slider.minimum() or not self.downscale:
+                message = (f'Evaluation refused: resolution {self.viewmodel.resolution} exceeds '
+                           f'the {self.memory_budget_mb} MiB memory budget for this zone.')
+                logging.error(message)
+                self.metrics_textbox.setPlainText(f'⚠ {message}\n')
+                return
+            notice = (f'Resolution lowered from {self.viewmodel.resolution} to {resolution} '
+                      f'to fit the {self.memory_budget_mb} MiB memory budget.')
+            logging.warning(notice)
+            self.viewmodel.set__resolution(resolution)
+            self.evaluation_timer.stop()
+            zone_dirpath = self._zone_dirpath(resolution)
+        
+        start = time.perf_counter()
+        result = None
+        if self.service_url:
+            try:
+                result = evaluate_remote(
+                    self.service_url,
+                    self.viewmodel.resolution,
+                    self.viewmodel.zone_dim_meters,
+                    self.viewmodel.config_meters,
+                    self.viewmodel.Pr_table,
+                )
+            except Exception as e:
+                logging.error(f'Failed to evaluate through the service at "{self.service_url}", evaluating locally.\nError Details: {e}')
+        if result is None:
+            result = evaluate(
+                self.viewmodel.resolution, 
+                self.viewmodel.zone_dim_meters,
+                self.viewmodel.config_meters,
+                self.viewmodel.Pr_table,
+                zone_dirpath,
+                self.debug,
+            )
+        uncertainty = self.evaluate_uncertainty_bands() if self.uncertainty > 0 else None
+        evaluate_ms = 1e3 * (time.perf_counter() - start)
         self.viewmodel.set__evaluation_result(result)
-    
-        # --- Update metrics display instead of printing ---
-        metrics_text = (
+        if self.results_store is not None:
+            self.results_store.record(
+                self.viewmodel.resolution,
+                self.viewmodel.zone_dim_meters,
+                self.viewmodel.config_meters,
+                self.viewmodel.Pr_table,
+                result.metrics,
+                self.viewmodel.csv_filepath,
+            )
+        
+        # --- Update plots ---
+        start = time.perf_counter()
+        self.update_plots(result)
+        plot_ms = 1e3 * (time.perf_counter() - start)
+        self.evaluation_delay.record(evaluate_ms, plot_ms)
+        self.update_metrics_textbox(result, evaluate_ms, plot_ms, notice, uncertainty)
+        
+        
+    def evaluate_uncertainty_bands(self):
+        """
+        Estimate the uncertainty bands of the interior repeat cell's metrics for the
+        current inputs, with a fixed seed so that identical inputs get identical bands.
+        
+        The bands depend neither on the zone nor on the plots, so those of recent inputs
+        are cached by the content key of the resolution, configuration, Pr table and
+        relative error, and edits of the zone reuse them.
+        
+        Returns:
+            Namespace: The result of `evaluate_uncertainty()`, or None if it failed.
+        """
+        key = content_key(
+            self.viewmodel.resolution,
+            self.viewmodel.config_meters,
+            self.viewmodel.Pr_table,
+            self.uncertainty,
+        )
+        if key in self.uncertainty_cache:
+            self.uncertainty_cache.move_to_end(key)
+            return self.uncertainty_cache[key]
+        try:
+            uncertainty = evaluate_uncertainty(
+                self.viewmodel.resolution,
+                self.viewmodel.config_meters,
+                self.viewmodel.Pr_table,
+                self.uncertainty,
+                constants.Evaluation.UNCERTAINTY_SAMPLES,
+                constants.Evaluation.UNCERTAINTY_PERCENTILES,
+                constants.Evaluation.UNCERTAINTY_SEED,
+            )
+        except Exception as e:
+            logging.error(f'Failed to estimate the uncertainty of the metrics.\nError Details: {e}')
+            return None
+        self.uncertainty_cache[key] = uncertainty
+        while len(self.uncertainty_cache) > constants.Evaluation.UNCERTAINTY_CACHE_SIZE:
+            self.uncertainty_cache.popitem(last=False)
+        return uncertainty
+        
+        
+    def _zone_dirpath(self, resolution):
+        """
+        Scratch directory backing the zone at the given resolution, or None if
+        the zone is small enough to be kept in memory.
+        """
+        zone_bytes = 8 * np.prod(np.array(self.viewmodel.zone_dim_meters) * resolution)
+        return constants.Evaluation.SCRATCH_DIRPATH if zone_bytes >= constants.Evaluation.MEMMAP_MIN_BYTES else None
+        
+        
+    def update_metrics_textbox(self, result, evaluate_ms=None, plot_ms=None, notice=None, uncertainty=None):
+        """
+        Display the metrics of an evaluation result, followed by their uncertainty bands
+        and its timings if known and, in debug mode, the per-stage profile of the evaluation.
+        
+        Parameters:
+            result (Namespace): The result returned by `evaluate()`.
+            evaluate_ms (float): Wall time of the evaluation in milliseconds.
+            plot_ms (float): Wall time of the plotting in milliseconds.
+            notice (str): Optional notice shown above the metrics.
+            uncertainty (Namespace): The result returned by `evaluate_uncertainty()`.
+        """
+        metrics_text = f'⚠ {notice}\n\n' if notice else ''
+        metrics_text += (
             '💧 Uniformaity\n'
             '----------------------\n'
             f'Christiansen Uniformity (CU): {result.metrics.CU:.2f} %\n'
             f'Distribution Uniformity (DU): {result.metrics.DU:.2f} %\n'
         )
+        if uncertainty is not None:
+            low, high = constants.Evaluation.UNCERTAINTY_PERCENTILES
+            metrics_text += (
+                '\n'
+                f'🎲 Uncertainty (readings ±{100 * self.uncertainty:g} %)\n'
+                '----------------------\n'
+            )
+            for metric in ('CU', 'DU'):
+                summary = getattr(uncertainty, metric)
+                metrics_text += (f'{metric}: {summary.mean:.2f} ± {summary.std:.2f} % '
+                                 f'(P{low}–P{high}: {summary.percentiles[low]:.2f}–{summary.percentiles[high]:.2f} %)\n')
+            metrics_text += f'Interior cell, {constants.Evaluation.UNCERTAINTY_SAMPLES} samples\n'
+        if evaluate_ms is not None:
+            metrics_text += (
+                '\n'
+                '⏱ Timing\n'
+                '----------------------\n'
+                f'Evaluation: {evaluate_ms:.0f} ms\n'
+                f'Plotting: {plot_ms:.0f} ms\n'
+                f'Average cost: {self.evaluation_delay.cost_ms:.0f} ms\n'
+                f'Debounce delay: {self.evaluation_delay.delay_ms} ms\n'
+            )
+        if self.debug and result.profile is not None:
+            metrics_text += (
+                '\n'
+                '🔬 Stages\n'
+                '----------------------\n'
+            )
+            for stage, stage_profile in vars(result.profile).items():
+                shape = ' x '.join(map(str, stage_profile.shape)) or 'scalar'
+                metrics_text += f'{stage}: {stage_profile.ms:.1f} ms, {stage_profile.bytes / 1024**2:.1f} MiB, {shape}\n'
         self.metrics_textbox.setPlainText(metrics_text)
-        
-        # --- Update plots ---
-        self.zone_canvas.plot(result.zone, self.viewmodel.resolution, (45, -135))
-        self.homogenous_plot_canvas.plot(result.homogenous_plot, self.viewmodel.resolution, (45, -135))
 
 
+    def update_plots(self, result):
+        """
+        Plot an evaluation result on the canvases of the current plot mode only;
+        the other mode is marked stale and replotted when switched to. The statistics
+        of the region selected on the zone heatmap are recomputed for the new result.
+        
+        Parameters:
+            result (Namespace): The result returned by `evaluate()`.
+        """
+        plot_mode = self.plot_mode_dropdown.currentIndex()
+        if plot_mode == 0:
+            self.zone_canvas.plot(result.zone, self.viewmodel.resolution, (45, -135))
+            self.homogenous_plot_canvas.plot(result.homogenous_plot, self.viewmodel.resolution, (45, -135))
+        else:
+            self.zone_heatmap_canvas.plot(result.zone, self.viewmodel.resolution, result.sprinklers_mask)
+            self.homogenous_plot_heatmap_canvas.plot(result.homogenous_plot, self.viewmodel.resolution, result.homogenous_sprinklers_mask)
+            self.update_region_statistics(self.zone_heatmap_canvas.region_extents or (), True)
+        self.stale_plot_modes = {0, 1} - {plot_mode}
+        
+        
+    def update_region_statistics(self, extents, final):
+        """
+        Show the statistics of a region selected on the zone heatmap, or a hint
+        if no region is selected.
+        
+        The mean, standard deviation and wetted coverage are answered in O(1) from the
+        zone's summed-area tables, built on the first selection of each evaluation result,
+        so they follow the rubber band live. On release, the minimum and CU of the
+        region are computed too.
+        
+        Parameters:
+            extents (tuple[float, float, float, float]): x_min, x_max, y_min, y_max in meters,
+                                                          or empty if no region is selected.
+            final (bool): Whether the selection is complete.
+        """
+        result = self.viewmodel.evaluation_result
+        if not extents or result is None:
+            self.region_label.setText('Drag on the heatmap to select a region.')
+            return
+        if getattr(result, 'integral', None) is None:
+            result.integral = build_integral_images(result.zone)
+        resolution = self.viewmodel.resolution
+        x_min, x_max, y_min, y_max = (int(np.floor(x * resolution + 0.5)) for x in extents)
+        region = query_region(result.integral, y_min, y_max + 1, x_min, x_max + 1)
+        if region is None:
+            self.region_label.setText('Empty region.')
+            return
+        width, height = (x_max - x_min + 1) / resolution, (y_max - y_min + 1) / resolution
+        text = (f'Region {width:.2f} x {height:.2f} m: mean {region.mean:.2f} mm/hr, '
+                f'std {region.std:.2f}, coverage {100 * region.coverage:.1f} %')
+        if final:
+            portion = np.asarray(result.zone[max(y_min, 0) : y_max + 1, max(x_min, 0) : x_max + 1])
+            text += f', min {portion.min():.2f}, CU {compute_CU(portion):.2f} %'
+        self.region_label.setText(text)
+        
+        
+    def save_project(self, filepath):
+        """
+        Save the configuration, Pr grid and latest evaluation result to a project file.
+        
+        A pending (debounced) evaluation is run first, so that the saved result is that
+        of the saved inputs; if they still differ (e.g. the evaluation was refused),
+        nothing is saved.
+        
+        Parameters:
+            filepath (str): Path of the project file (.npz).
+        """
+        if self.evaluation_timer.isActive():
+            self.evaluation_timer.stop()
+            self.update_evaluation_result()
+        result = self.viewmodel.evaluation_result
+        if result is None:
+            return
+        key = content_key(
+            self.viewmodel.resolution,
+            self.viewmodel.zone_dim_meters,
+            self.viewmodel.config_meters,
+            self.viewmodel.Pr_table,
+        )
+        if result.key != key:
+            logging.error(f'Failed to save project to "{filepath}".\nError Details: the latest evaluation does not match the current inputs.')
+            return
+        save_project(
+            filepath,
+            self.viewmodel.resolution,
+            self.viewmodel.zone_dim_meters,
+            self.viewmodel.config_meters,
+            self.viewmodel.csv_filepath,
+            self.viewmodel.snapshots_dirpath,
+            self.viewmodel.Pr_grid,
+            self.viewmodel.Pr_step,
+            result,
+        )
+        
+        
+    def open_project(self, filepath):
+        """
+        Restore the configuration, Pr grid and evaluation result saved in a project file,
+        displaying the saved result without re-evaluating it.
+        
+        Parameters:
+            filepath (str): Path of the project file (.npz).
+        """
+        project = load_project(filepath)
+        self.viewmodel.set__resolution(project.resolution)
+        self.viewmodel.set__zone_dim_meters(project.zone_dim_meters)
+        self.viewmodel.set__config_meters(project.config_meters)
+        self.viewmodel.set__csv_filepath(project.csv_filepath)
+        self.viewmodel.set__snapshots_dirpath(project.snapshots_dirpath)
+        self.viewmodel.set__Pr_step(project.Pr_step)
+        self.viewmodel.set__Pr_grid(project.Pr_grid)
+        self.update_table(project.Pr_grid)
+        self.evaluation_timer.stop()
+        
+        result = project.evaluation_result
+        self.viewmodel.set__evaluation_result(result)
+        self.update_plots(result)
+        self.update_metrics_textbox(result)
+        
+        
     def export_config(self):
         """
         Exports the current configuration from the ViewModel
@@ -21,7 +21,7 @@ from model import Model
 from PyQt5.QtCore import QObject, pyqtSignal, pyqtProperty
 import numpy as np
 from argparse import Namespace
-from utils import namespace_equal
+from utils import content_key
 
 class ViewModel(QObject):
     
@@ -114,7 +114,7 @@ class ViewModel(QObject):
         return self._model.Pr_table
     
     def set__Pr_table(self, value:np.array):
-        if not np.array_equal(self._model.Pr_table, value):
+        if self._model.Pr_table_key != content_key(value):
             self._model.Pr_table = value
             self.Pr_table__changed.emit(value)
             self.Pr_step__changed.emit(self._model.Pr_step)
@@ -124,6 +124,14 @@ class ViewModel(QObject):
                             fset=set__Pr_table,
                             notify=Pr_table__changed)
     
+    def _emit_Pr_table__changed(self):
+        """
+        Notify a change of the Pr table derived from the Pr grid and step, only if
+        anything listens: the table is derived lazily, on its first read.
+        """
+        if self.receivers(self.Pr_table__changed):
+            self.Pr_table__changed.emit(self._model.Pr_table)
+    
     def get__Pr_step(self):
         return self._model.Pr_step
      
@@ -131,7 +139,7 @@ class ViewModel(QObject):
         if self._model.Pr_step != value:
             self._model.Pr_step = value
             self.Pr_step__changed.emit(value)
-            self.Pr_table__changed.emit(self._model.Pr_table)
+            self._emit_Pr_table__changed()
      
     Pr_step = pyqtProperty(float, fget=get__Pr_step,
                            fset=set__Pr_step,
@@ -141,10 +149,10 @@ class ViewModel(QObject):
         return self._model.Pr_grid
     
     def set__Pr_grid(self, value:np.array):
-        if not np.array_equal(self._model.Pr_grid, value):
+        if self._model.Pr_grid_key != content_key(value):
             self._model.Pr_grid = value
             self.Pr_grid__changed.emit(value)
-            self.Pr_table__changed.emit(self._model.Pr_table)
+            self._emit_Pr_table__changed()
     
     Pr_grid = pyqtProperty('QVariant', fget=get__Pr_grid,
                             fset=set__Pr_grid,
@@ -154,7 +162,8 @@ class ViewModel(QObject):
         return self._model.evaluation_result
     
     def set__evaluation_result(self, value:Namespace):
-        if not namespace_equal(self._model.evaluation_result, value):
+        current = self._model.evaluation_result
+        if current is None or current.key != value.key:
             self._model.evaluation_result = value
             self.evaluation_result__changed.emit(value)
     
@@ -21,8 +21,14 @@ along with this program. If not, see <https://www.gnu.org/licenses/>.
 from matplotlib.backends.backend_qt5agg import FigureCanvasQTAgg
 from matplotlib.figure import Figure
 from PyQt5.QtWidgets import QHeaderView, QDoubleSpinBox
-from PyQt5.QtCore import Qt
+from PyQt5.QtCore import Qt, pyqtSignal
+from matplotlib.patches import Rectangle
+from snapshots import draw_surface
+from utils import profiled
+from argparse import Namespace
+from collections import deque
 import numpy as np
+import time
 import constants
 import os
 
@@ -30,14 +36,26 @@ class Canvas4ImageAs3D(FigureCanvasQTAgg):
     """
     3D Matplotlib canvas to display images as surface plots,
     with optional keyboard rotation and disabled mouse interaction.
+    
+    Every frame is timed: building the surface (plots only), rendering the figure
+    with Agg (`draw`) and copying the rendered buffer to the widget (`blit`, measured
+    when Qt paints it). The timings of recent frames and the surface's vertex count
+    are available from `render_stats`, and can be overlaid on the canvas (toggled with `F`).
     """
-    def __init__(self, parent=None, w=5, h=4, dpi=100, minimum_width=500):
+    def __init__(self, parent=None, w=5, h=4, dpi=100, minimum_width=500, show_render_stats=False):
         fig = Figure((w, h), dpi)
         super().__init__(fig)
         self.ax = fig.add_subplot(111, projection='3d')
         self.setFocusPolicy(Qt.StrongFocus)
         self.setMinimumWidth(minimum_width)
+        self.frames = deque(maxlen=constants.Rendering.TIMINGS_HISTORY)
+        self.surface = None
+        self.vertices = 0
+        self.show_render_stats = show_render_stats
+        self.render_stats_text = fig.text(0.01, 0.01, '', fontsize=constants.Rendering.OVERLAY_FONTSIZE,
+                                          family='monospace', visible=show_render_stats)
         
+    @profiled
     def plot(self, image, resolution, deg_angles):
         """
         Render a 3D surface plot from a 2D image array with proper axis scaling.
@@ -47,24 +65,74 @@ class Canvas4ImageAs3D(FigureCanvasQTAgg):
             resolution: spatial resolution in meters per pixel
             deg_angles: tuple (elev, azim) for initial viewing angles in degrees
         """
-        h, w = image.shape
-        x_range = np.arange(w) / resolution
-        y_range = np.arange(h) / resolution
-        x_map, y_map = np.meshgrid(x_range, y_range)
-    
-        self.ax.clear()
-        self.ax.plot_surface(x_map, y_map, image, cmap='Blues', edgecolor='none')
-        self.ax.view_init(*deg_angles)
-        self.ax.set_xlabel('x (m)', labelpad=10)
-        self.ax.set_ylabel('y (m)', labelpad=10)
-        self.ax.set_zlabel('Pr (mm/hr)', labelpad=10)
+        start = time.perf_counter()
+        self.surface = draw_surface(self.ax, image, resolution, deg_angles)
+        surface_ms = 1e3 * (time.perf_counter() - start)
+        self._timed_draw('plot', surface_ms)
         
-        dx = x_range.max() - x_range.min()
-        dy = y_range.max() - y_range.min()
-        dz = 0.5 * (dx + dy)
-        self.ax.set_box_aspect([dx, dy, dz])
-    
+    def _timed_draw(self, kind, surface_ms=0.0):
+        """
+        Render the figure, recording the frame's timings under `frames`.
+        """
+        self._update_render_stats_text()
+        start = time.perf_counter()
         self.draw()
+        draw_ms = 1e3 * (time.perf_counter() - start)
+        if self.surface is not None:
+            self.vertices = sum(len(path.vertices) for path in self.surface.get_paths())
+        self.frames.append(Namespace(
+            kind       = kind,
+            surface_ms = surface_ms,
+            draw_ms    = draw_ms,
+            blit_ms    = None,
+            vertices   = self.vertices,
+        ))
+        
+    @property
+    def render_stats(self):
+        """
+        Timings of the recent frames.
+    
+        Returns:
+            Namespace: Contains
+                - frames (list[Namespace]): Per-frame `kind` ('plot' or 'rotate'), `surface_ms`,
+                  `draw_ms`, `blit_ms` (None until painted) and `vertices`, oldest first.
+                - last_ms (float): Total time of the last frame in milliseconds.
+                - average_ms (float): Average total time of the recent frames in milliseconds.
+                - fps (float): Frames per second sustainable at the average frame time.
+                - vertices (int): Vertex count of the current surface.
+        """
+        total_ms = [frame.surface_ms + frame.draw_ms + (frame.blit_ms or 0.0) for frame in self.frames]
+        average_ms = float(np.mean(total_ms)) if total_ms else float('nan')
+        return Namespace(
+            frames     = list(self.frames),
+            last_ms    = total_ms[-1] if total_ms else float('nan'),
+            average_ms = average_ms,
+            fps        = 1e3 / average_ms if average_ms > 0 else float('nan'),
+            vertices   = self.vertices,
+        )
+        
+    def _update_render_stats_text(self):
+        """
+        Refresh the overlay with the timings of the frames drawn so far.
+        """
+        self.render_stats_text.set_visible(self.show_render_stats)
+        if not self.show_render_stats or not self.frames:
+            return
+        stats = self.render_stats
+        self.render_stats_text.set_text(
+            f'last {stats.last_ms:.0f} ms | avg {stats.average_ms:.0f} ms | '
+            f'{stats.fps:.1f} FPS | {stats.vertices} vertices'
+        )
+        
+    def paintEvent(self, event):
+        """
+        Paint the rendered buffer, recording the time as the last frame's blit time.
+        """
+        start = time.perf_counter()
+        super().paintEvent(event)
+        if self.frames and self.frames[-1].blit_ms is None:
+            self.frames[-1].blit_ms = 1e3 * (time.perf_counter() - start)
 
     def mousePressEvent(self, event):       pass
     def mouseReleaseEvent(self, event):     pass
@@ -77,6 +145,7 @@ class Canvas4ImageAs3D(FigureCanvasQTAgg):
         Rotate the 3D plot using WASD keys:
             W/S: Elevation up/down
             A/D: Azimuth left/right
+            F: Toggle the render statistics overlay
         Shift modifier reduces rotation step to 1 degree.
         """
         degrees = 1 if event.modifiers() & Qt.ShiftModifier else 5
@@ -89,7 +158,9 @@ class Canvas4ImageAs3D(FigureCanvasQTAgg):
                 self.ax.azim += degrees
             case Qt.Key_D:
                 self.ax.azim -= degrees
-        self.draw()
+            case Qt.Key_F:
+                self.show_render_stats = not self.show_render_stats
+        self._timed_draw('rotate')
         
     def export_png(self, filepath):
         filepath = os.path.abspath(filepath)
@@ -97,6 +168,121 @@ class Canvas4ImageAs3D(FigureCanvasQTAgg):
         os.makedirs(dirpath, exist_ok=True)
         self.figure.savefig(filepath, dpi=300, bbox_inches='tight')
         
+class Canvas4ImageAs2D(FigureCanvasQTAgg):
+    """
+    2D Matplotlib canvas to display images as top-down heatmaps,
+    with an optional overlay of sprinkler positions.
+    
+    The image artist is created once and updated in place on subsequent plots.
+    Dragging with the left mouse button draws a rubber-band rectangle, emitting
+    `region_selected` with its extents in meters (x_min, x_max, y_min, y_max) while
+    dragging, then once more with `final` set on release; a drag released outside the
+    axes ends at its last position within them. A click clears it, emitting empty
+    extents. The last complete selection is kept in `region_extents`.
+    """
+    region_selected = pyqtSignal(tuple, bool)
+    
+    def __init__(self, parent=None, w=5, h=4, dpi=100, minimum_width=500):
+        fig = Figure((w, h), dpi)
+        super().__init__(fig)
+        self.ax = fig.add_subplot(111)
+        self.ax.set_xlabel('x (m)')
+        self.ax.set_ylabel('y (m)')
+        self.image = None
+        self.sprinklers = None
+        self.region = Rectangle((0, 0), 0, 0, fill=False, edgecolor='tab:orange', linestyle='--', visible=False)
+        self.ax.add_patch(self.region)
+        self.region_origin = None
+        self.region_pointer = None
+        self.region_extents = None
+        self.mpl_connect('button_press_event', self._on_region_press)
+        self.mpl_connect('motion_notify_event', self._on_region_drag)
+        self.mpl_connect('button_release_event', self._on_region_release)
+        self.setMinimumWidth(minimum_width)
+        
+    def _on_region_press(self, event):
+        """
+        Start a rubber-band selection at the pressed point.
+        """
+        if event.button != 1 or event.inaxes is not self.ax:
+            return
+        self.region_origin = self.region_pointer = (event.xdata, event.ydata)
+        self.region_extents = None
+        self.region.set_visible(False)
+        self.draw_idle()
+        
+    def _region_extents(self, event):
+        """
+        Extents (x_min, x_max, y_min, y_max) from the selection's origin to an event's position,
+        or to the last position within the axes if the event is outside them.
+        """
+        x0, y0 = self.region_origin
+        if event.inaxes is self.ax and event.xdata is not None:
+            self.region_pointer = (event.xdata, event.ydata)
+        x1, y1 = self.region_pointer
+        return (min(x0, x1), max(x0, x1), min(y0, y1), max(y0, y1))
+        
+    def _on_region_drag(self, event):
+        """
+        Resize the rubber band to the pointer and emit its live extents.
+        """
+        if self.region_origin is None or event.inaxes is not self.ax:
+            return
+        x_min, x_max, y_min, y_max = extents = self._region_extents(event)
+        self.region.set_bounds(x_min, y_min, x_max - x_min, y_max - y_min)
+        self.region.set_visible(True)
+        self.draw_idle()
+        self.region_selected.emit(extents, False)
+        
+    def _on_region_release(self, event):
+        """
+        Finish the selection, emitting its final extents unless it is empty.
+        """
+        if self.region_origin is None:
+            return
+        x_min, x_max, y_min, y_max = extents = self._region_extents(event)
+        self.region_origin = None
+        if x_max > x_min and y_max > y_min:
+            self.region_extents = extents
+            self.region_selected.emit(extents, True)
+        else:
+            self.region.set_visible(False)
+            self.draw_idle()
+            self.region_selected.emit((), True)
+        
+    def plot(self, image, resolution, sprinklers_mask=None):
+        """
+        Render a 2D image array as a heatmap with proper axis scaling.
+    
+        Parameters:
+            image: 2D numpy array representing Pr values
+            resolution: spatial resolution in pixels per meter
+            sprinklers_mask: optional boolean array of the image's shape marking sprinkler positions
+        """
+        h, w = image.shape
+        halfpixel = 0.5 / resolution
+        extent = (-halfpixel, w / resolution - halfpixel, -halfpixel, h / resolution - halfpixel)
+        if self.image is None:
+            self.image = self.ax.imshow(image, cmap='Blues', origin='lower', extent=extent,
+                                        interpolation='nearest', aspect='equal')
+            self.figure.colorbar(self.image, ax=self.ax, label='Pr (mm/hr)')
+            self.sprinklers = self.ax.scatter([], [], s=20, marker='x', color='tab:red')
+        else:
+            self.image.set_data(image)
+            self.image.set_extent(extent)
+        self.image.set_clim(image.min(), image.max())
+        
+        if sprinklers_mask is None:
+            offsets = np.empty((0, 2))
+        else:
+            y, x = np.nonzero(sprinklers_mask)
+            offsets = np.stack([x, y], axis=1) / resolution
+        self.sprinklers.set_offsets(offsets)
+        self.ax.set_xlim(extent[:2])
+        self.ax.set_ylim(extent[2:])
+        
+        self.draw_idle()
+        
 class DoubleSpinBox(QDoubleSpinBox):
     """
     QDoubleSpinBox with preset defaults for decimals, step, and minimum width.